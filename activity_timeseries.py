@@ -0,0 +1,149 @@
+"""Bidding activity over the day, per user, branch or zone.
+
+Quote Time is parsed once into minutes since midnight of the first day, and
+each dimension is factorized into int32 codes. Counting one dimension at one
+window size (hourly, 15 minutes) is then one pass over
+``code * window_count + window`` that keeps only the observed (member,
+window) pairs, stored by member. Memory follows the number of pairs that
+occur, not members x days x windows, so a month of 15-minute windows for
+tens of thousands of users stays small. Timelines are densified only for
+the members shown, and time-of-day profiles fold the days into a compact
+members x windows-per-day array.
+"""
+import numpy as np
+import pandas as pd
+
+from export_diff import parse_export_times
+
+TIME_COLUMN = 'Quote Time'
+ACTIVITY_DIMENSIONS = ['User', 'Branch Name', 'Zone']
+MINUTES_PER_DAY = 24 * 60
+# (label, minutes) choices offered by the Bidding Activity tab
+ACTIVITY_WINDOWS = [('Hourly', 60), ('15 minutes', 15)]
+
+
+class ActivityGrid:
+    """Bid counts of one dimension per time window, stored sparse by member.
+
+    Only observed (member, window) pairs are kept, in CSR layout: the window
+    numbers and counts of member ``i`` are ``windows[indptr[i]:indptr[i + 1]]``
+    and ``counts[...]``. Dense rows are built only for the members sliced.
+    """
+    def __init__(self, members, indptr, windows, counts, window_count, start, window_minutes):
+        self.members = members                  # sorted member labels
+        self.indptr = indptr
+        self.windows = windows                  # window number from start, per observed pair
+        self.counts = counts                    # int32 bids per observed pair
+        self.window_count = window_count
+        self.start = start                      # midnight of the first day
+        self.window_minutes = window_minutes
+        self._positions = {member: i for i, member in enumerate(members)}
+
+    @property
+    def windows_per_day(self):
+        return MINUTES_PER_DAY // self.window_minutes
+
+    @property
+    def day_count(self):
+        return self.window_count // self.windows_per_day
+
+    def total(self):
+        """Bids counted over all members and windows."""
+        return int(self.counts.sum())
+
+    def window_starts(self):
+        """Start time of every window of the timeline."""
+        return pd.date_range(self.start, periods=self.window_count, freq=f"{self.window_minutes}min")
+
+    def window_labels(self):
+        """'HH:MM' start of each window of a day."""
+        return [f"{minute // 60:02d}:{minute % 60:02d}"
+                for minute in range(0, MINUTES_PER_DAY, self.window_minutes)]
+
+    def timeline(self, member):
+        """Bids per window over the whole period for one member."""
+        i = self._positions[member]
+        row = np.zeros(self.window_count, dtype=np.int32)
+        row[self.windows[self.indptr[i]:self.indptr[i + 1]]] = self.counts[self.indptr[i]:self.indptr[i + 1]]
+        return row
+
+    def time_of_day(self):
+        """Bids per window of the day summed over all days, one row per member."""
+        member_ids = np.repeat(np.arange(len(self.members)), np.diff(self.indptr))
+        flat = member_ids * self.windows_per_day + self.windows % self.windows_per_day
+        profile = np.bincount(flat, weights=self.counts, minlength=len(self.members) * self.windows_per_day)
+        return profile.astype(np.int32).reshape(len(self.members), self.windows_per_day)
+
+    def profile_table(self, members=None):
+        """Members x time-of-day windows, with each member's total and peak window."""
+        profile = self.time_of_day()
+        rows = slice(None) if members is None else [self._positions[member] for member in members]
+        labels = self.window_labels()
+        table = pd.DataFrame(profile[rows], columns=labels,
+                             index=pd.Index(np.array(self.members, dtype=object)[rows], name='Member'))
+        peak = table.to_numpy().argmax(axis=1)
+        table.insert(0, 'Total', table[labels].sum(axis=1))
+        table.insert(1, 'Peak Window', [labels[i] for i in peak])
+        table.insert(2, 'Peak Bids', table[labels].to_numpy()[np.arange(len(table)), peak])
+        return table
+
+    def timeline_table(self, members=None):
+        """Windows over the whole period: the total, plus one column per given member."""
+        members = [] if members is None else members
+        table = pd.DataFrame({member: self.timeline(member) for member in members},
+                             index=pd.Index(self.window_starts(), name='Window'))
+        if members:
+            total = table.sum(axis=1)
+        else:
+            total = np.bincount(self.windows, weights=self.counts, minlength=self.window_count).astype(np.int32)
+        table.insert(0, 'Total', total)
+        return table
+
+
+class ActivityIndex:
+    """Parsed quote times and dimension codes of one dataset, with an ActivityGrid cache."""
+    def __init__(self, df, dimensions=ACTIVITY_DIMENSIONS):
+        if TIME_COLUMN not in df.columns:
+            raise ValueError(f"Data has no '{TIME_COLUMN}' column")
+        times = parse_export_times(df[TIME_COLUMN])
+        if times.notna().sum() == 0:
+            raise ValueError(f"No '{TIME_COLUMN}' values could be parsed")
+
+        self.start = times.min().normalize()
+        minutes = (times - self.start) // pd.Timedelta(minutes=1)
+        # -1 marks rows without a quote time
+        self._minutes = minutes.fillna(-1).to_numpy(dtype=np.int64)
+        self.day_count = int(self._minutes.max() // MINUTES_PER_DAY) + 1
+
+        self._codes = {}
+        self._members = {}
+        for dimension in dimensions:
+            if dimension in df.columns:
+                codes, uniques = pd.factorize(df[dimension], sort=True)
+                self._codes[dimension] = codes.astype(np.int32)
+                self._members[dimension] = [str(value) for value in uniques]
+        self._grids = {}
+
+    @property
+    def dimensions(self):
+        return list(self._codes)
+
+    def grid(self, dimension, window_minutes=60):
+        """ActivityGrid of a dimension at a window size that divides a day."""
+        if MINUTES_PER_DAY % window_minutes:
+            raise ValueError("Window size must divide a day evenly")
+        key = (dimension, window_minutes)
+        grid = self._grids.get(key)
+        if grid is None:
+            members = self._members[dimension]
+            codes = self._codes[dimension]
+            window_count = self.day_count * (MINUTES_PER_DAY // window_minutes)
+            keep = (codes >= 0) & (self._minutes >= 0)
+            flat = codes[keep].astype(np.int64) * window_count + self._minutes[keep] // window_minutes
+            # Only observed (member, window) pairs, sorted by member then window
+            pairs, counts = np.unique(flat, return_counts=True)
+            indptr = np.searchsorted(pairs // window_count, np.arange(len(members) + 1)).astype(np.int64)
+            grid = ActivityGrid(members, indptr, (pairs % window_count).astype(np.int32),
+                                counts.astype(np.int32), window_count, self.start, window_minutes)
+            self._grids[key] = grid
+        return grid
\ No newline at end of file
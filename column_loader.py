@@ -0,0 +1,44 @@
+"""Column-projected CSV loading.
+
+Each report declares the columns it needs and the loader parses only those
+(``usecols``), so parse time and memory follow the columns a report uses
+rather than the width of the export. Columns needed later, e.g. once a page
+shows the full table, are read in one more pass and joined on by position.
+"""
+import pandas as pd
+
+
+def clean_column_name(name):
+    """Strip whitespace and a UTF-8 byte order mark from a header cell."""
+    return str(name).strip().replace('\ufeff', '')
+
+
+class CsvColumnLoader:
+    """Reads a CSV header once, then only the columns asked for."""
+    def __init__(self, path, encoding=None):
+        self.path = path
+        self.encoding = encoding
+        header = pd.read_csv(path, nrows=0, encoding=encoding).columns
+        self.columns = [clean_column_name(col) for col in header]
+        self._raw_names = dict(zip(self.columns, header))
+
+    def available(self, columns):
+        """The given columns that exist in the file, in file order."""
+        wanted = set(columns)
+        return [col for col in self.columns if col in wanted]
+
+    def read(self, columns=None):
+        """Parse the given columns (all if None); names not in the file are skipped."""
+        names = self.columns if columns is None else self.available(columns)
+        df = pd.read_csv(self.path, usecols=[self._raw_names[col] for col in names], encoding=self.encoding)
+        df.columns = [clean_column_name(col) for col in df.columns]
+        return df[names]
+
+    def add_columns(self, df, columns=None):
+        """Return df with the given columns (all remaining if None) read in, in file order."""
+        names = self.columns if columns is None else self.available(columns)
+        missing = [col for col in names if col not in df.columns]
+        if not missing:
+            return df
+        combined = pd.concat([df.reset_index(drop=True), self.read(missing)], axis=1)
+        return combined[[col for col in self.columns if col in combined.columns]]
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""Day-over-day comparison of two broker-bidding exports.
+
+Rows are keyed on (Load No., Broker). When a broker quoted the same load more
+than once, quotes with the same Quote Time in both exports are paired first,
+and only the quotes left over are paired in Quote Time order, so dropping one
+quote of several does not shift the others. Keys are hashed into a single
+uint64 per row and the two exports are hash-joined on it, so the comparison
+runs in time linear in the row count.
+"""
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ['Load No.', 'Broker']
+TIEBREAK_COLUMN = 'Quote Time'
+EXPORT_TIME_FORMAT = '%b %d, %Y, %I:%M:%S %p'
+COMPARED_COLUMNS = ['Quote', 'Status']
+CONTEXT_COLUMNS = ['Date', 'Zone', 'Branch Name', 'User', 'Customer', 'Quote Time']
+REQUIRED_COLUMNS = KEY_COLUMNS + [TIEBREAK_COLUMN] + COMPARED_COLUMNS
+# Everything diff_exports reads; other export columns need not be loaded
+DIFF_COLUMNS = REQUIRED_COLUMNS + [col for col in CONTEXT_COLUMNS if col not in REQUIRED_COLUMNS]
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+
+def parse_export_times(values):
+    """Parse export timestamps ('Aug 1, 2025, 3:56:33 AM'); unparseable values become NaT."""
+    times = pd.to_datetime(values, format=EXPORT_TIME_FORMAT, errors='coerce')
+    unparsed = times.isna() & values.notna()
+    if unparsed.any():
+        # Element-wise parsing is slow, so only use it for rows in another format
+        times[unparsed] = pd.to_datetime(values[unparsed], format='mixed', errors='coerce')
+    return times
+
+
+def _keyed(df):
+    """Return df with '_key' hashing (Load No., Broker) and '_time' holding the parsed Quote Time."""
+    keyed = df.reset_index(drop=True)
+    # Normalize key dtypes so e.g. an int and a float Load No. column hash alike
+    parts = pd.DataFrame({
+        col: (keyed[col].astype('float64') if pd.api.types.is_numeric_dtype(keyed[col])
+              else keyed[col].astype(str).str.strip())
+        for col in KEY_COLUMNS
+    })
+    keyed['_key'] = pd.util.hash_pandas_object(parts, index=False).to_numpy()
+    keyed['_time'] = parse_export_times(keyed[TIEBREAK_COLUMN])
+    return keyed
+
+
+def _sequence_hash(groups, order):
+    """Hash each row's group together with its rank in the group by ``order``."""
+    seq = order.groupby(groups).rank(method='first', na_option='bottom')
+    return pd.util.hash_pandas_object(
+        pd.DataFrame({'group': groups.to_numpy(), 'seq': seq.to_numpy()}), index=False).to_numpy()
+
+
+def _exact_hashes(keyed):
+    """Hash rows on (key, Quote Time, repeat number); the mask tells which rows have a time."""
+    times = keyed['_time'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    groups = pd.util.hash_pandas_object(pd.DataFrame({'key': keyed['_key'], 'time': times}), index=False)
+    return _sequence_hash(groups, pd.Series(np.arange(len(keyed)))), keyed['_time'].notna().to_numpy()
+
+
+def _join_keys(keyed, exact, matched):
+    """Join keys: the exact hash where it matched, else the (key, Quote Time order) hash of the rest."""
+    join = exact.copy()
+    rest = ~matched
+    join[rest] = _sequence_hash(keyed['_key'][rest], keyed['_time'][rest])
+    return join
+
+
+def _differs(old, new):
+    """Element-wise inequality that treats two missing values as equal."""
+    return ~((old == new) | (old.isna() & new.isna()))
+
+
+def diff_exports(previous_df, current_df):
+    """Compare two exports and return (diff DataFrame, summary counts).
+
+    The diff has one row per added, removed or changed quote, with the
+    previous and current Quote/Status side by side.
+    """
+    missing = [col for col in REQUIRED_COLUMNS
+               if col not in previous_df.columns or col not in current_df.columns]
+    if missing:
+        raise ValueError(f"Both exports need columns: {', '.join(missing)}")
+
+    context = [col for col in CONTEXT_COLUMNS if col in current_df.columns and col in previous_df.columns]
+    keep = KEY_COLUMNS + context + COMPARED_COLUMNS
+    previous = _keyed(previous_df)
+    current = _keyed(current_df)
+    # Quotes with the same Quote Time in both exports pair first; the rest pair in time order
+    previous_exact, previous_timed = _exact_hashes(previous)
+    current_exact, current_timed = _exact_hashes(current)
+    previous_join = _join_keys(previous, previous_exact,
+                               previous_timed & np.isin(previous_exact, current_exact[current_timed]))
+    current_join = _join_keys(current, current_exact,
+                              current_timed & np.isin(current_exact, previous_exact[previous_timed]))
+    previous = previous[keep].assign(_join=previous_join)
+    current = current[keep].assign(_join=current_join)
+
+    merged = current.merge(previous, on='_join', how='outer', suffixes=('', '_prev'),
+                           indicator=True, sort=False)
+    only_previous = (merged['_merge'] == 'right_only').to_numpy()
+    only_current = (merged['_merge'] == 'left_only').to_numpy()
+
+    changed = np.zeros(len(merged), dtype=bool)
+    for col in COMPARED_COLUMNS:
+        changed |= _differs(merged[f'{col}_prev'], merged[col]).to_numpy()
+    changed &= ~(only_previous | only_current)
+
+    # Removed rows only have values on the previous side
+    for col in KEY_COLUMNS + context:
+        merged.loc[only_previous, col] = merged.loc[only_previous, f'{col}_prev']
+
+    change = np.select([only_current, only_previous, changed], [ADDED, REMOVED, CHANGED], default='')
+    merged.insert(0, 'Change', change)
+    result = merged[merged['Change'] != ''].rename(columns={
+        **{f'{col}_prev': f'Previous {col}' for col in COMPARED_COLUMNS},
+        **{col: f'Current {col}' for col in COMPARED_COLUMNS},
+    })
+    columns = (['Change'] + KEY_COLUMNS + context
+               + [f'{side} {col}' for col in COMPARED_COLUMNS for side in ('Previous', 'Current')])
+    result = result[columns].reset_index(drop=True)
+    # The outer join turns integer columns into floats; restore them for display
+    for col in result.columns:
+        values = result[col]
+        if pd.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+            result[col] = values.astype('Int64')
+
+    summary = {kind: int((result['Change'] == kind).sum()) for kind in (ADDED, REMOVED, CHANGED)}
+    return result, summary
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""Distinct-value index for filter autocomplete and facet counts.
+
+Each column is factorized once into int32 codes over its distinct values,
+sorted case-insensitively so a completer can binary-search prefixes. Facet
+counts for any row subset are then a single ``np.bincount`` over the codes of
+those rows. Columns are indexed lazily, the first time they are asked for.
+"""
+import numpy as np
+import pandas as pd
+
+
+class ColumnFacet:
+    """Sorted distinct values of one column and their row counts."""
+    def __init__(self, series):
+        codes, uniques = pd.factorize(series)
+        labels = np.array([str(value) for value in uniques], dtype=object)
+        order = np.argsort(np.array([label.lower() for label in labels], dtype=object), kind='stable')
+        rank = np.empty(len(order), dtype=np.int32)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+
+        self.values = labels[order].tolist()
+        self.codes = np.where(codes >= 0, rank[np.maximum(codes, 0)], -1).astype(np.int32)
+        self.totals = self.counts()
+
+    def counts(self, rows=None):
+        """Occurrences of each distinct value among the given row positions (all rows if None)."""
+        codes = self.codes if rows is None else self.codes[rows]
+        return np.bincount(codes[codes >= 0], minlength=len(self.values))
+
+
+class FacetIndex:
+    """Lazily built ColumnFacet for every column of a DataFrame."""
+    def __init__(self, df):
+        self._df = df
+        self._facets = {}
+
+    def column(self, name):
+        facet = self._facets.get(name)
+        if facet is None:
+            facet = ColumnFacet(self._df[name])
+            self._facets[name] = facet
+        return facet
+
+    def values(self, name):
+        """Sorted distinct values of a column, as strings."""
+        return self.column(name).values
+
+    def rebind(self, df):
+        """Point at an identical copy of the data (e.g. memory-mapped, or with more columns), keeping built columns."""
+        self._df = df
+
+    def built_columns(self):
+        return list(self._facets)
\ No newline at end of file
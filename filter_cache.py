@@ -0,0 +1,232 @@
+"""Filter-state caching for the dashboard pages.
+
+A filter state is the set of active ``{column: text}`` filters. Each
+normalized state maps to an int32 array of matching row positions held in a
+memory-bounded LRU cache, so switching back to a recent combination of
+filters costs a dictionary lookup instead of a scan of every filtered column.
+Derived results (sort orders, aggregates) can be stored against a state and
+are dropped with it; their bytes count against the same budget.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+HISTORY_LIMIT = 100
+
+
+def normalize_filter_state(filters):
+    """Return a hashable, case-insensitive key for a ``{column: text}`` filter dict."""
+    return tuple(sorted((column, text.strip().lower())
+                        for column, text in filters.items() if text.strip()))
+
+
+def _refines(state, base):
+    """True if every row matching ``state`` also matches ``base``."""
+    narrowed = dict(state)
+    return all(column in narrowed and text in narrowed[column] for column, text in base)
+
+
+def filter_mask(df, filters, rows=None):
+    """Return the int32 positions of rows matching all substring filters.
+
+    ``rows`` restricts the scan to a previously computed superset of rows.
+    """
+    if rows is None:
+        rows = np.arange(len(df), dtype=np.int32)
+    for column, text in filters:
+        if column not in df.columns or len(rows) == 0:
+            continue
+        values = df[column].iloc[rows]
+        mask = values.astype(str).str.contains(text, case=False, na=False, regex=False).to_numpy()
+        rows = rows[mask]
+    return rows.astype(np.int32, copy=False)
+
+
+def _nbytes(value):
+    """Approximate heap size of a cached derived result."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(item) for item in value.values())
+    if hasattr(value, 'memory_usage'):
+        return int(np.sum(value.memory_usage(deep=True)))
+    return 0
+
+
+class _ExtrasDict(dict):
+    """Derived results of one cached state; stored values are charged to the cache.
+
+    Nested dicts added through ``setdefault`` (e.g. the sort orders of a
+    search query) are tracked the same way.
+    """
+    def __init__(self, cache, state, root=None):
+        super().__init__()
+        self._cache = cache
+        self._state = state
+        self._root = self if root is None else root
+
+    def __setitem__(self, key, value):
+        if isinstance(value, dict) and not isinstance(value, _ExtrasDict):
+            nested = _ExtrasDict(self._cache, self._state, self._root)
+            nested.update(value)
+            value = nested
+        change = _nbytes(value) - (_nbytes(self[key]) if key in self else 0)
+        super().__setitem__(key, value)
+        self._cache._charge(self._state, self._root, change)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, other=(), **kwargs):
+        for key, value in dict(other, **kwargs).items():
+            self[key] = value
+
+    def pop(self, key, *default):
+        if key not in self:
+            return super().pop(key, *default)
+        value = super().pop(key)
+        self._cache._charge(self._state, self._root, -_nbytes(value))
+        return value
+
+    def __delitem__(self, key):
+        self.pop(key)
+
+
+class FilterStateCache:
+    """LRU map from normalized filter state to matching row positions."""
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._rows = OrderedDict()
+        self._extras = {}
+        self._extra_bytes = {}
+        self._bytes = 0
+
+    def clear(self):
+        self._rows.clear()
+        self._extras.clear()
+        self._extra_bytes.clear()
+        self._bytes = 0
+
+    def __contains__(self, state):
+        return state in self._rows
+
+    def items(self):
+        """(state, rows) pairs from least to most recently used."""
+        return list(self._rows.items())
+
+    def get(self, state):
+        rows = self._rows.get(state)
+        if rows is not None:
+            self._rows.move_to_end(state)
+        return rows
+
+    def put(self, state, rows):
+        if state in self._rows:
+            self._bytes -= self._rows.pop(state).nbytes
+        self._rows[state] = rows
+        self._bytes += rows.nbytes
+        self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and len(self._rows) > 1:
+            evicted, old_rows = self._rows.popitem(last=False)
+            self._bytes -= old_rows.nbytes + self._extra_bytes.pop(evicted, 0)
+            self._extras.pop(evicted, None)
+
+    def _charge(self, state, extras, change):
+        # Dicts of states evicted since they were handed out are no longer counted
+        if self._extras.get(state) is not extras:
+            return
+        self._extra_bytes[state] = self._extra_bytes.get(state, 0) + change
+        self._bytes += change
+        self._evict()
+
+    def rows_for(self, df, state):
+        """Return cached rows for a state, computing (and caching) them on a miss.
+
+        On a miss, the smallest cached state that the new one narrows (e.g.
+        the previous keystroke) is used as the starting row set.
+        """
+        rows = self.get(state)
+        if rows is not None:
+            return rows
+        base = None
+        for cached_state, cached_rows in self._rows.items():
+            if _refines(state, cached_state) and (base is None or len(cached_rows) < len(base)):
+                base = cached_rows
+        rows = filter_mask(df, state, base)
+        self.put(state, rows)
+        return rows
+
+    def get_extra(self, state, name):
+        """Return a derived result stored for a cached state, or None."""
+        return self._extras.get(state, {}).get(name)
+
+    def put_extra(self, state, name, value):
+        """Store a derived result (sort order, aggregate) for a cached state."""
+        self.extras(state)[name] = value
+
+    def drop_extras(self, kind):
+        """Release the derived results named ``(kind, ...)`` of every cached state."""
+        for extras in list(self._extras.values()):
+            for name in [name for name in extras if isinstance(name, tuple) and name[:1] == (kind,)]:
+                extras.pop(name)
+
+    def extras(self, state):
+        """Mutable dict of derived results for a state; not retained if the state is uncached."""
+        if state not in self._rows:
+            return {}
+        if state not in self._extras:
+            self._extras[state] = _ExtrasDict(self, state)
+        return self._extras[state]
+
+
+class FilterHistory:
+    """Back/forward navigation over visited filter states."""
+    def __init__(self, limit=HISTORY_LIMIT):
+        self.limit = limit
+        self._states = []
+        self._position = -1
+
+    def clear(self):
+        self._states = []
+        self._position = -1
+
+    def current(self):
+        return self._states[self._position] if self._states else None
+
+    def push(self, filters, replace=False):
+        """Record a new filter dict, dropping any forward history.
+
+        ``replace`` overwrites the current entry, used while the user is still
+        typing so each keystroke does not become its own history step.
+        """
+        if filters == self.current():
+            return
+        del self._states[self._position + 1:]
+        if replace and self._states:
+            self._states[-1] = filters
+        else:
+            self._states.append(filters)
+            if len(self._states) > self.limit:
+                del self._states[0]
+        self._position = len(self._states) - 1
+
+    def can_go_back(self):
+        return self._position > 0
+
+    def can_go_forward(self):
+        return self._position < len(self._states) - 1
+
+    def back(self):
+        if self.can_go_back():
+            self._position -= 1
+        return self.current()
+
+    def forward(self):
+        if self.can_go_forward():
+            self._position += 1
+        return self.current()
\ No newline at end of file
@@ -1,13 +1,19 @@
 import sys
 import pandas as pd
 import os
-import re
 from datetime import datetime
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QLabel, QFileDialog,
                              QMessageBox, QFrame, QGridLayout, QTextEdit)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
+from template_filler import (read_template, fill_template, write_filled_workbook,
+                             write_filled_csv, is_excel_file, day_columns, GRAND_TOTAL,
+                             TemplateSheet, MAIN_DATA_COLUMNS, extract_day, prepare_main_data)
+from column_loader import CsvColumnLoader
+from session_store import save_session, load_session, json_value, SESSION_FILE_FILTER
+from memory_budget import deep_size, format_bytes
+from user_matching import normalize_user_name
 
 class BidDataFillerApp(QMainWindow):
     def __init__(self):
@@ -15,6 +21,8 @@ class BidDataFillerApp(QMainWindow):
         self.main_data_df = None
         self.template_df = None
         self.filled_df = None
+        self.template_sheets = []
+        self.match_results = []
         self.main_file_path = ""
         self.template_file_path = ""
         self.setup_ui()
@@ -45,7 +53,7 @@ class BidDataFillerApp(QMainWindow):
         instructions_layout.addWidget(inst_title)
         
         instructions_layout.addWidget(QLabel("1. Select your main data CSV file (with Date, User, Zone columns)"))
-        instructions_layout.addWidget(QLabel("2. Select your unfilled template CSV file"))
+        instructions_layout.addWidget(QLabel("2. Select your unfilled template (CSV or XLSX, all sheets are filled)"))
         instructions_layout.addWidget(QLabel("3. Click 'Process Data' to fill the template with correct bid counts"))
         instructions_layout.addWidget(QLabel("4. Click 'Download Filled Template' to save the result"))
         
@@ -68,12 +76,12 @@ class BidDataFillerApp(QMainWindow):
         file_layout.addWidget(self.btn_select_main, 0, 2)
         
         # Template file
-        file_layout.addWidget(QLabel("Template CSV:"), 1, 0)
+        file_layout.addWidget(QLabel("Template (CSV/XLSX):"), 1, 0)
         self.template_file_label = QLabel("No file selected")
         self.template_file_label.setStyleSheet("color: #7f8c8d; font-style: italic;")
         file_layout.addWidget(self.template_file_label, 1, 1)
         
-        self.btn_select_template = QPushButton("Select Template CSV")
+        self.btn_select_template = QPushButton("Select Template File")
         self.btn_select_template.setStyleSheet("background-color: #3498db; color: white; padding: 8px; border-radius: 4px;")
         self.btn_select_template.clicked.connect(self.select_template_file)
         file_layout.addWidget(self.btn_select_template, 1, 2)
@@ -97,6 +105,20 @@ class BidDataFillerApp(QMainWindow):
         
         main_layout.addLayout(buttons_layout)
         
+        # Session buttons
+        session_layout = QHBoxLayout()
+        
+        self.btn_save_session = QPushButton("Save Session")
+        self.btn_save_session.setEnabled(False)
+        self.btn_save_session.clicked.connect(self.save_session)
+        session_layout.addWidget(self.btn_save_session)
+        
+        self.btn_open_session = QPushButton("Open Session")
+        self.btn_open_session.clicked.connect(self.open_session)
+        session_layout.addWidget(self.btn_open_session)
+        
+        main_layout.addLayout(session_layout)
+        
         # Status and log area
         status_frame = QFrame()
         status_layout = QVBoxLayout(status_frame)
@@ -138,9 +160,10 @@ class BidDataFillerApp(QMainWindow):
             self.check_files_ready()
     
     def select_template_file(self):
-        """Select template CSV file"""
+        """Select template CSV or XLSX file"""
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select Template CSV File", "", "CSV Files (*.csv);;All Files (*)"
+            self, "Select Template File", "",
+            "Template Files (*.csv *.xlsx *.xlsm);;CSV Files (*.csv);;Excel Files (*.xlsx *.xlsm);;All Files (*)"
         )
         
         if file_path:
@@ -159,32 +182,12 @@ class BidDataFillerApp(QMainWindow):
             self.status_label.setStyleSheet("font-weight: bold; color: #27ae60; padding: 10px;")
     
     def clean_user_name(self, name):
-        """Clean user name by removing extra spaces and BOM characters"""
-        if pd.isna(name):
-            return None
-        return str(name).strip().replace('\ufeff', '').replace('\u200b', '')
+        """Normalize user name (case, whitespace, Unicode) into its matching key"""
+        return normalize_user_name(name)
     
     def extract_day_from_date(self, date_str):
         """Extract day number from date string - improved version"""
-        if pd.isna(date_str) or not isinstance(date_str, str):
-            return None
-        
-        # Clean the string
-        date_str = str(date_str).strip().replace('\ufeff', '')
-        
-        # Pattern 1: "Aug 1, 2025, 3:56:33 AM" or similar
-        match = re.search(r'Aug\s+(\d+)[,\s]', date_str)
-        if match:
-            day = int(match.group(1))
-            return day if 1 <= day <= 6 else None
-        
-        # Pattern 2: Just "Aug 1" format
-        match = re.search(r'Aug\s+(\d+)', date_str)
-        if match:
-            day = int(match.group(1))
-            return day if 1 <= day <= 6 else None
-            
-        return None
+        return extract_day(date_str)
     
     def process_data(self):
         """Process the data and fill the template - CORRECTED VERSION"""
@@ -193,51 +196,39 @@ class BidDataFillerApp(QMainWindow):
             self.status_label.setText("Status: Processing data...")
             self.status_label.setStyleSheet("font-weight: bold; color: #f39c12; padding: 10px;")
             
-            # Load main data file
+            # Load main data file, parsing only the columns the filler uses (names are cleaned)
             self.log("Loading main data file...")
             try:
-                self.main_data_df = pd.read_csv(self.main_file_path, encoding='utf-8-sig')
+                loader = CsvColumnLoader(self.main_file_path, encoding='utf-8-sig')
+                self.main_data_df = loader.read(MAIN_DATA_COLUMNS)
             except UnicodeDecodeError:
-                self.main_data_df = pd.read_csv(self.main_file_path, encoding='latin1')
+                loader = CsvColumnLoader(self.main_file_path, encoding='latin1')
+                self.main_data_df = loader.read(MAIN_DATA_COLUMNS)
             
-            # Clean column names
-            self.main_data_df.columns = [col.strip().replace('\ufeff', '') for col in self.main_data_df.columns]
             self.log(f"Main data loaded: {len(self.main_data_df)} rows")
-            self.log(f"Main data columns: {list(self.main_data_df.columns)}")
-            
-            # Load template file (skip first row)
-            self.log("Loading template file...")
-            try:
-                self.template_df = pd.read_csv(self.template_file_path, skiprows=1, encoding='utf-8-sig')
-            except UnicodeDecodeError:
-                self.template_df = pd.read_csv(self.template_file_path, skiprows=1, encoding='latin1')
-            
-            # Clean template column names
-            self.template_df.columns = [col.strip().replace('\ufeff', '') for col in self.template_df.columns]
-            self.log(f"Template loaded: {len(self.template_df)} rows")
+            self.log(f"Main data columns: {loader.columns}")
+            self.log(f"Columns read: {list(self.main_data_df.columns)}")
             
             # Validate columns
             if 'User' not in self.main_data_df.columns or 'Date' not in self.main_data_df.columns:
                 raise ValueError("Main data must have 'User' and 'Date' columns")
             
-            if 'User' not in self.template_df.columns:
-                raise ValueError("Template must have 'User' column")
-            
-            # Clean user names in both dataframes
-            self.log("Cleaning user names...")
-            self.main_data_df['User_Clean'] = self.main_data_df['User'].apply(self.clean_user_name)
-            self.template_df['User_Clean'] = self.template_df['User'].apply(self.clean_user_name)
+            # Load every fillable sheet of the template; header rows are detected automatically
+            self.log("Loading template file...")
+            self.template_sheets = read_template(self.template_file_path)
+            if not self.template_sheets:
+                raise ValueError("Template must have a 'User' header row")
+            for sheet in self.template_sheets:
+                self.log(f"Template sheet '{sheet.name}': {len(sheet.data)} rows, "
+                         f"day columns {day_columns(sheet.header)}")
+            self.template_df = self.template_sheets[0].data
             
-            # Remove rows with null users from main data
+            # Clean user names, drop rows without a user and extract day numbers from dates
+            self.log("Cleaning user names and extracting day numbers from dates...")
             initial_count = len(self.main_data_df)
-            self.main_data_df = self.main_data_df[self.main_data_df['User_Clean'].notna()]
-            self.main_data_df = self.main_data_df[self.main_data_df['User_Clean'] != '']
+            self.main_data_df, user_keys = prepare_main_data(self.main_data_df)
             self.log(f"Removed {initial_count - len(self.main_data_df)} rows with empty users from main data")
             
-            # Extract days from dates
-            self.log("Extracting day numbers from dates...")
-            self.main_data_df['Day'] = self.main_data_df['Date'].apply(self.extract_day_from_date)
-            
             # Show day extraction results
             valid_days = self.main_data_df['Day'].dropna()
             self.log(f"Valid days extracted: {len(valid_days)} out of {len(self.main_data_df)} records")
@@ -248,115 +239,89 @@ class BidDataFillerApp(QMainWindow):
                     self.log(f"  Day {day}: {count} records")
             
             # Filter to only valid day records
-            main_data_valid = self.main_data_df[self.main_data_df['Day'].notna()].copy()
+            main_data_valid = self.main_data_df[self.main_data_df['Day'].notna()]
             self.log(f"Processing {len(main_data_valid)} records with valid days")
             
-            # Get unique users from main data
-            main_users = set(main_data_valid['User_Clean'].unique())
-            self.log(f"Unique users in main data: {len(main_users)}")
+            # Count bids by user and day once, match template users and fill every sheet
+            self.match_results = fill_template(self.main_data_df, self.template_sheets, prepared=True)
+            valid_users = set(main_data_valid['User_Clean'].unique())
+            self.log(f"Unique users in main data: {len(valid_users)}")
+            display_names = {}
+            for user, key in user_keys.items():
+                display_names.setdefault(key, user)
             
-            # Create copy of template for filling
-            self.filled_df = self.template_df.copy()
-            
-            # Initialize all day columns with 0
-            day_columns = ['1', '2', '3', '4', '5', '6']
-            for col in day_columns:
-                if col in self.filled_df.columns:
-                    self.filled_df[col] = 0
-            
-            if 'Grand Total' in self.filled_df.columns:
-                self.filled_df['Grand Total'] = 0
-            
-            # Count bids by user and day
-            user_day_counts = main_data_valid.groupby(['User_Clean', 'Day']).size().reset_index(name='BidCount')
-            self.log(f"Generated {len(user_day_counts)} user-day combinations")
-            
-            # Process each user in template
-            self.log("=== Processing individual users ===")
             processed_users = 0
             users_with_data = 0
             users_without_data = 0
+            fuzzy_matches = 0
+            initials_matches = 0
+            ambiguous_matches = 0
             
-            for idx, template_row in self.filled_df.iterrows():
-                user_clean = template_row['User_Clean']
-                user_original = template_row['User']
-                
-                # Skip Grand Total row
-                if pd.isna(user_clean) or user_clean == '' or user_clean == 'Grand Total':
-                    continue
+            for result in self.match_results:
+                if result.method == 'fuzzy':
+                    fuzzy_matches += 1
+                    self.log(f"≈ {result.name} matched to {display_names[result.match]} "
+                             f"(confidence {result.score:.2f})")
+                elif result.method == 'initials':
+                    initials_matches += 1
+                    self.log(f"≈ {result.name} matched to {display_names[result.match]} by initials")
+                elif result.method == 'ambiguous':
+                    ambiguous_matches += 1
+                    options = ', '.join(f"{display_names[key]} ({score:.2f})" for key, score in result.candidates)
+                    self.log(f"? {result.name} is ambiguous, not matched: {options}")
+            
+            for sheet in self.template_sheets:
+                self.log(f"=== Sheet '{sheet.name}' ===")
+                days = day_columns(sheet.filled.columns)
                 
-                # Check if this user exists in main data
-                if user_clean in main_users:
-                    # User has data - get their bid counts
-                    user_bids = user_day_counts[user_day_counts['User_Clean'] == user_clean]
+                for idx, row in sheet.filled.iterrows():
+                    user_clean = row['User_Clean']
+                    user_original = row['User']
+                    
+                    # Skip blank and Grand Total rows
+                    if pd.isna(user_clean) or user_clean == '' or user_clean == GRAND_TOTAL:
+                        continue
                     
-                    if not user_bids.empty:
-                        user_total = 0
-                        daily_counts = []
-                        
-                        for _, bid_row in user_bids.iterrows():
-                            day = int(bid_row['Day'])
-                            count = bid_row['BidCount']
-                            
-                            if 1 <= day <= 6:
-                                day_col = str(day)
-                                if day_col in self.filled_df.columns:
-                                    self.filled_df.at[idx, day_col] = count
-                                    user_total += count
-                                    daily_counts.append(f"Day {day}={count}")
-                        
-                        # Set Grand Total
-                        if 'Grand Total' in self.filled_df.columns:
-                            self.filled_df.at[idx, 'Grand Total'] = user_total
-                        
-                        if user_total > 0:
-                            users_with_data += 1
-                            self.log(f"✓ {user_original}: {user_total} bids ({', '.join(daily_counts)})")
-                        else:
-                            users_without_data += 1
-                            self.log(f"○ {user_original}: 0 bids (user exists but no valid day data)")
+                    user_total = int(row[days].sum())
+                    if user_total > 0:
+                        users_with_data += 1
+                        daily_counts = [f"Day {day}={row[day]}" for day in days if row[day] > 0]
+                        self.log(f"✓ {user_original}: {user_total} bids ({', '.join(daily_counts)})")
+                    elif user_clean in valid_users:
+                        users_without_data += 1
+                        self.log(f"○ {user_original}: 0 bids (user exists but no valid day data)")
                     else:
                         users_without_data += 1
-                        self.log(f"○ {user_original}: 0 bids (user exists but no day counts)")
-                else:
-                    # User does not exist in main data - leave as 0
-                    users_without_data += 1
-                    self.log(f"○ {user_original}: 0 bids (user not found in main data)")
+                        self.log(f"○ {user_original}: 0 bids (user not found in main data)")
+                    
+                    processed_users += 1
                 
-                processed_users += 1
+                grand_total_rows = sheet.filled[sheet.filled['User_Clean'] == GRAND_TOTAL]
+                if not grand_total_rows.empty:
+                    gt_row = grand_total_rows.iloc[0]
+                    for day_col in days:
+                        self.log(f"Day {day_col} total: {gt_row[day_col]}")
+                    if GRAND_TOTAL in sheet.filled.columns:
+                        self.log(f"Overall Grand Total: {gt_row[GRAND_TOTAL]}")
             
-            # Calculate Grand Total row
-            grand_total_rows = self.filled_df[self.filled_df['User_Clean'] == 'Grand Total']
-            if not grand_total_rows.empty:
-                gt_idx = grand_total_rows.index[0]
-                
-                self.log("=== Calculating Grand Totals ===")
-                day_totals = {}
-                overall_total = 0
-                
-                for day_col in day_columns:
-                    if day_col in self.filled_df.columns:
-                        # Sum all users (exclude Grand Total row)
-                        col_total = self.filled_df[day_col].iloc[:-1].sum()
-                        self.filled_df.at[gt_idx, day_col] = col_total
-                        day_totals[day_col] = col_total
-                        overall_total += col_total
-                        self.log(f"Day {day_col} total: {col_total}")
-                
-                # Set overall grand total
-                if 'Grand Total' in self.filled_df.columns:
-                    self.filled_df.at[gt_idx, 'Grand Total'] = overall_total
-                    self.log(f"Overall Grand Total: {overall_total}")
+            self.filled_df = self.template_sheets[0].filled
             
             # Enable download
             self.btn_download.setEnabled(True)
+            self.btn_save_session.setEnabled(True)
             self.status_label.setText("Status: Processing complete! Ready to download.")
             self.status_label.setStyleSheet("font-weight: bold; color: #27ae60; padding: 10px;")
             
             self.log(f"=== PROCESSING COMPLETE ===")
+            self.log(f"Sheets filled: {len(self.template_sheets)}")
             self.log(f"Total users processed: {processed_users}")
             self.log(f"Users with data: {users_with_data}")
             self.log(f"Users without data: {users_without_data}")
+            self.log(f"Initials name matches: {initials_matches}")
+            self.log(f"Fuzzy name matches: {fuzzy_matches}")
+            self.log(f"Ambiguous names left unmatched: {ambiguous_matches}")
+            self.log(f"Memory: main data {format_bytes(deep_size(self.main_data_df))}, filled sheets "
+                     f"{format_bytes(sum(deep_size(sheet.filled) for sheet in self.template_sheets))}")
             
             # Show success message
             QMessageBox.information(
@@ -365,6 +330,9 @@ class BidDataFillerApp(QMainWindow):
                 f"• Total users processed: {processed_users}\n"
                 f"• Users with bid data: {users_with_data}\n"  
                 f"• Users with no data: {users_without_data}\n"
+                f"• Initials name matches: {initials_matches}\n"
+                f"• Fuzzy name matches: {fuzzy_matches}\n"
+                f"• Ambiguous names (not matched): {ambiguous_matches}\n"
                 f"• Check the log for detailed user-by-user breakdown\n\n"
                 f"Ready to download the corrected template!"
             )
@@ -384,23 +352,28 @@ class BidDataFillerApp(QMainWindow):
             QMessageBox.warning(self, "No Data", "No processed data to download.")
             return
         
-        # Suggest filename
+        # Suggest filename; XLSX templates are saved back as workbooks
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        default_filename = f"corrected_bidding_report_{timestamp}.csv"
+        save_as_excel = is_excel_file(self.template_file_path)
+        if save_as_excel:
+            default_filename = f"corrected_bidding_report_{timestamp}.xlsx"
+            file_filter = "Excel Files (*.xlsx)"
+        else:
+            default_filename = f"corrected_bidding_report_{timestamp}.csv"
+            file_filter = "CSV Files (*.csv)"
         
         file_path, _ = QFileDialog.getSaveFileName(
-            self, "Save Corrected Template", default_filename, "CSV Files (*.csv)"
+            self, "Save Corrected Template", default_filename, file_filter
         )
         
         if file_path:
             try:
-                # Create final output without the User_Clean column
-                output_df = self.filled_df.drop('User_Clean', axis=1)
-                
-                # Save with the original header
-                with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                    f.write("(North Branch) Day Wise Biding Report,,,,,,,,,\n")
-                    output_df.to_csv(f, index=False)
+                if save_as_excel:
+                    # Write values into the original workbook so formatting is kept
+                    write_filled_workbook(self.template_file_path, file_path, self.template_sheets)
+                else:
+                    # Save with the original header rows, without the User_Clean column
+                    write_filled_csv(file_path, self.template_sheets[0])
                 
                 filename = os.path.basename(file_path)
                 self.status_label.setText(f"Status: File saved successfully")
@@ -420,6 +393,65 @@ class BidDataFillerApp(QMainWindow):
                 self.log(f"ERROR saving file: {error_msg}")
                 QMessageBox.critical(self, "Save Error", f"Failed to save file:\n\n{error_msg}")
 
+    def save_session(self):
+        """Save the loaded main data and filled template sheets to a session file"""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Session", "", SESSION_FILE_FILTER)
+        if not file_path:
+            return
+        try:
+            tables = {'main_data': self.main_data_df}
+            sheets = []
+            for i, sheet in enumerate(self.template_sheets):
+                tables[f"sheet{i}.data"] = sheet.data
+                tables[f"sheet{i}.filled"] = sheet.filled
+                sheets.append({
+                    'name': sheet.name,
+                    'preamble': [[json_value(value) for value in row] for row in sheet.preamble],
+                    'header': sheet.header,
+                })
+            state = {
+                'main_file_path': self.main_file_path,
+                'template_file_path': self.template_file_path,
+                'sheets': sheets,
+            }
+            save_session(file_path, tables, {}, state)
+            self.log(f"Session saved: {os.path.basename(file_path)}")
+        except Exception as e:
+            QMessageBox.critical(self, "Save Error", f"Failed to save session:\n\n{str(e)}")
+    
+    def open_session(self):
+        """Restore main data and filled sheets from a session file without re-processing"""
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open Session", "", SESSION_FILE_FILTER)
+        if not file_path:
+            return
+        try:
+            tables, _, state = load_session(file_path)
+            self.main_data_df = tables.get('main_data')
+            self.template_sheets = []
+            for i, meta in enumerate(state['sheets']):
+                sheet = TemplateSheet(meta['name'], meta['preamble'], meta['header'], tables[f"sheet{i}.data"])
+                sheet.filled = tables.get(f"sheet{i}.filled")
+                self.template_sheets.append(sheet)
+            self.template_df = self.template_sheets[0].data if self.template_sheets else None
+            self.filled_df = self.template_sheets[0].filled if self.template_sheets else None
+            self.match_results = []
+            
+            self.main_file_path = state['main_file_path']
+            self.template_file_path = state['template_file_path']
+            for label, path in ((self.main_file_label, self.main_file_path),
+                                (self.template_file_label, self.template_file_path)):
+                label.setText(os.path.basename(path))
+                label.setStyleSheet("color: #27ae60; font-weight: bold;")
+            self.check_files_ready()
+            
+            self.btn_download.setEnabled(self.filled_df is not None)
+            self.btn_save_session.setEnabled(True)
+            self.status_label.setText("Status: Session restored! Ready to download.")
+            self.log(f"Session restored: {os.path.basename(file_path)} "
+                     f"({len(self.template_sheets)} sheets)")
+        except Exception as e:
+            QMessageBox.critical(self, "Session Error", f"Failed to open session:\n\n{str(e)}")
+
 def main():
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
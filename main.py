@@ -1,50 +1,275 @@
+import os
 import sys
+import time
+import numpy as np
 import pandas as pd
 from datetime import date
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QTableView, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QComboBox, QCheckBox, QLineEdit,
                              QFileDialog, QMessageBox, QTabWidget, QLabel, QHeaderView,
-                             QGroupBox, QGridLayout, QSplitter, QFrame)
-from PyQt5.QtCore import QAbstractTableModel, Qt, pyqtSignal, QSortFilterProxyModel
+                             QGroupBox, QGridLayout, QSplitter, QFrame, QAbstractItemView,
+                             QCompleter, QSpinBox)
+from PyQt5.QtCore import (QAbstractTableModel, QAbstractListModel, QModelIndex, Qt, pyqtSignal,
+                          QSortFilterProxyModel, QThread, QItemSelection, QItemSelectionModel,
+                          QItemSelectionRange)
 from PyQt5.QtGui import QFont
+from filter_cache import FilterStateCache, FilterHistory, normalize_filter_state
+from search_index import SearchIndex, tokenize
+from facet_index import FacetIndex
+from export_diff import diff_exports, DIFF_COLUMNS
+from session_store import save_session, load_session, SESSION_FILE_FILTER
+from memory_budget import MemoryAccountant, DEFAULT_BUDGET_MB, format_bytes
+from column_loader import CsvColumnLoader
+from pivot_transform import transform_bids, PIVOT_COLUMNS
+from activity_timeseries import ActivityIndex, ACTIVITY_WINDOWS
+
+# Keystrokes closer together than this are merged into one history step
+TYPING_PAUSE_SECONDS = 1.0
+# Rows measured when fitting column widths to their contents (Qt's default is 1000)
+RESIZE_SAMPLE_ROWS = 200
+# Larger selections are dropped, not carried over, when the visible rows change
+MAX_RESTORED_SELECTION_ROWS = 100_000
 
 class EnhancedTableModel(QAbstractTableModel):
-    """Enhanced table model with better data handling."""
+    """Long-lived table model over a base DataFrame, shown through a row-index mapping.
+    
+    Filtering and sorting only swap the int32 array of visible source rows, so
+    the view keeps its model, header state and (for sorting) its selection.
+    """
     def __init__(self, data=None):
         super().__init__()
-        self._data = data if data is not None else pd.DataFrame()
-        
+        self._source = pd.DataFrame()
+        self._columns = []
+        self._base_rows = np.empty(0, dtype=np.int32)
+        self._rows = self._base_rows
+        self._sort = None
+        self._sort_orders = {}
+        self.set_source(data)
+    
     def rowCount(self, parent=None):
-        return len(self._data)
+        return len(self._rows)
     
     def columnCount(self, parent=None):
-        return len(self._data.columns)
+        return len(self._columns)
     
     def data(self, index, role=Qt.DisplayRole):
         if not index.isValid():
             return None
         if role == Qt.DisplayRole:
-            value = self._data.iloc[index.row(), index.column()]
+            value = self._columns[index.column()][self._rows[index.row()]]
             return str(value) if pd.notna(value) else ""
         return None
     
     def headerData(self, col, orientation, role=Qt.DisplayRole):
         if orientation == Qt.Horizontal and role == Qt.DisplayRole:
-            return str(self._data.columns[col])
+            return str(self._source.columns[col])
         if orientation == Qt.Vertical and role == Qt.DisplayRole:
             return str(col + 1)
         return None
     
+    @property
+    def source(self):
+        return self._source
+    
+    @property
+    def rows(self):
+        """Source row positions in display order."""
+        return self._rows
+    
+    @property
+    def sort_column(self):
+        """Source column the rows are sorted by, or -1."""
+        return self._sort[0] if self._sort is not None else -1
+    
+    def set_source(self, data, rows=None):
+        """Show a new base DataFrame (all rows unless rows is given)."""
+        self.beginResetModel()
+        self._source = data if data is not None else pd.DataFrame()
+        # Categorical columns (e.g. restored from a session) are read through their codes, not expanded
+        self._columns = [self._column_values(self._source.iloc[:, i]) for i in range(self._source.shape[1])]
+        if self._sort is not None and self._sort[0] >= len(self._columns):
+            self._sort = None
+        self._set_base_rows(rows, None)
+        self.endResetModel()
+    
+    def replace_source(self, data):
+        """Swap in an identical copy of the source (e.g. memory-mapped), keeping rows and sort."""
+        self._source = data
+        self._columns = [self._column_values(self._source.iloc[:, i]) for i in range(self._source.shape[1])]
+    
+    def widen_source(self, data):
+        """Swap in the same rows with more columns, keeping rows and sort."""
+        sort_name = self._source.columns[self._sort[0]] if self._sort is not None else None
+        self.beginResetModel()
+        self._source = data
+        self._columns = [self._column_values(self._source.iloc[:, i]) for i in range(self._source.shape[1])]
+        if sort_name is not None:
+            self._sort = (data.columns.get_loc(sort_name), self._sort[1])
+        self.endResetModel()
+    
+    @staticmethod
+    def _column_values(series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return series.array
+        if isinstance(series.dtype, pd.StringDtype):
+            # The array's own object buffer; to_numpy() would copy it after a missing-value pass
+            return np.asarray(series.array)
+        return series.to_numpy()
+    
+    def set_rows(self, rows, sort_orders=None):
+        """Show only the given source rows, keeping the active sort.
+        
+        sort_orders is a dict where sorted row arrays for this row set are
+        cached, so re-visiting a filter state does not sort again.
+        """
+        self.beginResetModel()
+        self._set_base_rows(rows, sort_orders)
+        self.endResetModel()
+    
+    def _set_base_rows(self, rows, sort_orders):
+        if rows is None:
+            rows = np.arange(len(self._source), dtype=np.int32)
+        self._base_rows = rows
+        self._sort_orders = sort_orders if sort_orders is not None else {}
+        self._rows = self._sorted_rows()
+    
+    def _sorted_rows(self):
+        if self._sort is None:
+            return self._base_rows
+        column, order = self._sort
+        # Keyed by name so cached orders survive columns being added
+        key = (self._source.columns[column], order)
+        rows = self._sort_orders.get(key)
+        if rows is None:
+            values = self._source.iloc[self._base_rows, column].reset_index(drop=True)
+            ascending = order == Qt.AscendingOrder
+            try:
+                positions = values.sort_values(ascending=ascending, kind='stable').index
+            except TypeError:
+                # Mixed types in one column: fall back to comparing as text
+                positions = values.astype(str).sort_values(ascending=ascending, kind='stable').index
+            rows = self._base_rows[positions.to_numpy()]
+            self._sort_orders[key] = rows
+        return rows
+    
+    def view_rows(self, source_rows):
+        """Map source row positions to display rows (-1 where not shown)."""
+        lookup = np.full(len(self._source), -1, dtype=np.int64)
+        lookup[self._rows] = np.arange(len(self._rows))
+        return lookup[np.asarray(source_rows, dtype=np.int64)]
+    
     def sort(self, column, order):
+        if column < 0 or column >= len(self._columns):
+            return
         self.layoutAboutToBeChanged.emit()
-        ascending = order == Qt.AscendingOrder
-        self._data = self._data.sort_values(by=self._data.columns[column], ascending=ascending)
-        self._data.reset_index(drop=True, inplace=True)
+        old_rows = self._rows
+        self._sort = (column, order)
+        self._rows = self._sorted_rows()
+        
+        # Keep selection and current index on the same source rows
+        persistent = self.persistentIndexList()
+        if persistent:
+            new_positions = self.view_rows(old_rows[[idx.row() for idx in persistent]])
+            for idx, row in zip(persistent, new_positions):
+                self.changePersistentIndex(idx, self.index(int(row), idx.column()))
         self.layoutChanged.emit()
     
     def update_data(self, new_data):
+        self.set_source(new_data)
+
+def show_rows_preserving_view(view, model, rows, sort_orders=None):
+    """Swap the model's visible rows, keeping the selection and top row where still shown.
+    
+    The selection is remembered as source rows per column span and rebuilt
+    as one range per run of consecutive display rows. A select-all stays a
+    select-all; selections over MAX_RESTORED_SELECTION_ROWS are dropped.
+    """
+    selection_model = view.selectionModel()
+    select_all = False
+    spans = {}
+    if selection_model is not None and selection_model.hasSelection():
+        ranges = list(selection_model.selection())
+        select_all = (len(ranges) == 1 and ranges[0].top() == 0 and ranges[0].left() == 0
+                      and ranges[0].bottom() == model.rowCount() - 1
+                      and ranges[0].right() == model.columnCount() - 1)
+        if not select_all and sum(r.height() for r in ranges) <= MAX_RESTORED_SELECTION_ROWS:
+            for r in ranges:
+                spans.setdefault((r.left(), r.right()), []).append(model.rows[r.top():r.bottom() + 1])
+    top_row = view.rowAt(0)
+    top_source = int(model.rows[top_row]) if 0 <= top_row < len(model.rows) else None
+    
+    model.set_rows(rows, sort_orders)
+    
+    if select_all:
+        view.selectAll()
+    elif spans:
+        selection = QItemSelection()
+        for (left, right), parts in spans.items():
+            view_rows = np.unique(model.view_rows(np.concatenate(parts)))
+            view_rows = view_rows[view_rows >= 0]
+            if not len(view_rows):
+                continue
+            breaks = np.flatnonzero(np.diff(view_rows) != 1) + 1
+            starts = view_rows[np.r_[0, breaks]]
+            ends = view_rows[np.r_[breaks - 1, len(view_rows) - 1]]
+            for start, end in zip(starts, ends):
+                selection.append(QItemSelectionRange(model.index(int(start), left), model.index(int(end), right)))
+        selection_model.select(selection, QItemSelectionModel.ClearAndSelect)
+    if top_source is not None:
+        row = model.view_rows([top_source])[0]
+        if row >= 0:
+            view.scrollTo(model.index(int(row), 0), QAbstractItemView.PositionAtTop)
+
+class FacetListModel(QAbstractListModel):
+    """Distinct values of one column with live counts, feeding a filter completer.
+    
+    The model stays empty, and the column unindexed, until activate() is
+    called on the first keystroke (QCompleter queries the row count as soon
+    as it is attached).
+    """
+    def __init__(self, facet_index, column):
+        super().__init__()
+        self._facet_index = facet_index
+        self._column = column
+        self.facet = None
+        self._counts = None
+        self._visible = np.empty(0, dtype=np.int64)
+    
+    @property
+    def is_built(self):
+        return self.facet is not None
+    
+    def activate(self):
+        if self.facet is None:
+            self.beginResetModel()
+            self.facet = self._facet_index.column(self._column)
+            self._counts = self.facet.totals
+            self._visible = np.flatnonzero(self._counts)
+            self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._visible)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        code = self._visible[index.row()]
+        value = self.facet.values[code]
+        if role == Qt.EditRole:
+            return value
+        if role == Qt.DisplayRole:
+            return f"{value} ({self._counts[code]})"
+        return None
+    
+    def set_counts(self, counts):
+        """Show new per-value counts, hiding values that no longer occur."""
+        if self._counts is not None and np.array_equal(counts, self._counts):
+            return
         self.beginResetModel()
-        self._data = new_data.copy() if new_data is not None else pd.DataFrame()
+        self._counts = counts
+        self._visible = np.flatnonzero(counts)
         self.endResetModel()
 
 class FilterWidget(QWidget):
@@ -55,6 +280,10 @@ class FilterWidget(QWidget):
         super().__init__()
         self.columns = columns or []
         self.filter_inputs = {}
+        self.filter_labels = {}
+        self.facet_models = {}
+        self.history = FilterHistory()
+        self._last_edit = 0.0
         self._setup_ui()
     
     def _setup_ui(self):
@@ -70,6 +299,17 @@ class FilterWidget(QWidget):
         self.filter_layout = QGridLayout(self.filter_frame)
         layout.addWidget(self.filter_frame)
         
+        # History navigation
+        history_layout = QHBoxLayout()
+        self.back_btn = QPushButton("◀ Back")
+        self.forward_btn = QPushButton("Forward ▶")
+        self.back_btn.clicked.connect(self.go_back)
+        self.forward_btn.clicked.connect(self.go_forward)
+        history_layout.addWidget(self.back_btn)
+        history_layout.addWidget(self.forward_btn)
+        layout.addLayout(history_layout)
+        self._update_history_buttons()
+        
         # Reset button
         self.reset_btn = QPushButton("Reset All Filters")
         self.reset_btn.clicked.connect(self.reset_filters)
@@ -80,25 +320,109 @@ class FilterWidget(QWidget):
         self.columns = columns
         self._clear_filters()
         self._create_filter_inputs()
+        self.history.clear()
+        self.history.push({})
+        self._update_history_buttons()
+    
+    def add_columns(self, columns):
+        """Add inputs for columns not shown yet; existing inputs, their text and the history are kept."""
+        for column in columns:
+            if column not in self.filter_inputs:
+                self._create_filter_input(column)
+        self.columns = columns
+        for label, line_edit in zip(self.filter_labels.values(), self.filter_inputs.values()):
+            self.filter_layout.removeWidget(label)
+            self.filter_layout.removeWidget(line_edit)
+        for i, column in enumerate(self.columns):
+            self.filter_layout.addWidget(self.filter_labels[column], i, 0)
+            self.filter_layout.addWidget(self.filter_inputs[column], i, 1)
     
     def _clear_filters(self):
         """Clear existing filter inputs."""
         for i in reversed(range(self.filter_layout.count())): 
             self.filter_layout.itemAt(i).widget().setParent(None)
         self.filter_inputs.clear()
+        self.filter_labels.clear()
+        self.facet_models.clear()
     
     def _create_filter_inputs(self):
         """Create filter input widgets for each column."""
         for i, column in enumerate(self.columns):
-            label = QLabel(f"{column}:")
-            line_edit = QLineEdit()
-            line_edit.setPlaceholderText(f"Filter by {column}...")
-            line_edit.textChanged.connect(self.filters_changed.emit)
-            
+            label, line_edit = self._create_filter_input(column)
             self.filter_layout.addWidget(label, i, 0)
             self.filter_layout.addWidget(line_edit, i, 1)
-            
-            self.filter_inputs[column] = line_edit
+    
+    def _create_filter_input(self, column):
+        label = QLabel(f"{column}:")
+        line_edit = QLineEdit()
+        line_edit.setPlaceholderText(f"Filter by {column}...")
+        line_edit.textChanged.connect(self._on_text_changed)
+        self.filter_labels[column] = label
+        self.filter_inputs[column] = line_edit
+        return label, line_edit
+    
+    def set_facet_index(self, facet_index, columns=None):
+        """Attach prefix autocomplete with value counts to the filter inputs of columns (all if None)."""
+        if columns is None:
+            self.facet_models.clear()
+            columns = list(self.filter_inputs)
+        for column in columns:
+            line_edit = self.filter_inputs[column]
+            model = FacetListModel(facet_index, column)
+            # Connected before the completer so the values exist when it filters
+            line_edit.textEdited.connect(model.activate)
+            completer = QCompleter(model, line_edit)
+            completer.setCaseSensitivity(Qt.CaseInsensitive)
+            completer.setModelSorting(QCompleter.CaseInsensitivelySortedModel)
+            line_edit.setCompleter(completer)
+            self.facet_models[column] = model
+    
+    def refresh_facet_counts(self, rows_for_column):
+        """Recount indexed columns over the rows matched by all other filters."""
+        for column, model in self.facet_models.items():
+            if model.is_built:
+                model.set_counts(model.facet.counts(rows_for_column(column)))
+    
+    def _on_text_changed(self):
+        """Record the new filter state in history and notify listeners."""
+        now = time.monotonic()
+        self.history.push(self.get_active_filters(), replace=now - self._last_edit < TYPING_PAUSE_SECONDS)
+        self._last_edit = now
+        self._update_history_buttons()
+        self.filters_changed.emit()
+    
+    def _update_history_buttons(self):
+        self.back_btn.setEnabled(self.history.can_go_back())
+        self.forward_btn.setEnabled(self.history.can_go_forward())
+    
+    def set_filters(self, filters):
+        """Show the given filters in the inputs without emitting a change per box."""
+        for column, widget in self.filter_inputs.items():
+            widget.blockSignals(True)
+            widget.setText(filters.get(column, ""))
+            widget.blockSignals(False)
+    
+    def restore_filters(self, filters):
+        """Show saved filters as a fresh history entry without emitting a change."""
+        self.set_filters(filters)
+        self.history.push(self.get_active_filters())
+        self._update_history_buttons()
+    
+    def go_back(self):
+        """Restore the previous filter state."""
+        self._restore(self.history.back())
+    
+    def go_forward(self):
+        """Restore the next filter state."""
+        self._restore(self.history.forward())
+    
+    def _restore(self, filters):
+        if filters is None:
+            return
+        self.set_filters(filters)
+        self._last_edit = 0.0
+        self._update_history_buttons()
+        self.filters_changed.emit()
     
     def get_active_filters(self):
         """Get dictionary of active filters."""
@@ -111,14 +435,151 @@ class FilterWidget(QWidget):
         for widget in self.filter_inputs.values():
             widget.clear()
 
+class SearchIndexBuilder(QThread):
+    """Builds a SearchIndex for a DataFrame off the UI thread."""
+    index_ready = pyqtSignal(object)
+    
+    def __init__(self, df):
+        super().__init__()
+        self.df = df
+        self.index = None
+    
+    def run(self):
+        self.index = SearchIndex(self.df)
+        self.df = None
+        self.index_ready.emit(self.index)
+
+class ColumnLoadThread(QThread):
+    """Reads the columns a projected load skipped and joins them on, off the UI thread."""
+    columns_loaded = pyqtSignal(object)
+    load_failed = pyqtSignal(str)
+    
+    def __init__(self, loader, df, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.df = df
+    
+    def run(self):
+        try:
+            full_df = self.loader.add_columns(self.df)
+        except Exception as e:
+            self.load_failed.emit(str(e))
+            return
+        finally:
+            self.df = None
+        self.columns_loaded.emit(full_df)
+
+class GlobalSearchBox(QLineEdit):
+    """Search box matching rows on any column through an inverted index."""
+    search_changed = pyqtSignal()
+    
+    # Builders in flight, keyed by source DataFrame so pages fed the same data share one index build
+    _builders = {}
+    
+    def __init__(self):
+        super().__init__()
+        self.index = None
+        self._builder = None
+        self._apply_restored = False
+        self.setPlaceholderText("Search all columns...")
+        self.setEnabled(False)
+        self.textChanged.connect(self.search_changed.emit)
+    
+    def clear_index(self):
+        """Drop the index and disable the box until the next build_index."""
+        self.index = None
+        self._builder = None
+        self.blockSignals(True)
+        self.clear()
+        self.blockSignals(False)
+        self.setEnabled(False)
+        self.setPlaceholderText("Indexing for search...")
+    
+    def build_index(self, df):
+        """Start indexing df in the background; the box is enabled once ready."""
+        self.clear_index()
+        
+        key = id(df)
+        if key not in GlobalSearchBox._builders:
+            builder = SearchIndexBuilder(df)
+            builder.finished.connect(lambda: GlobalSearchBox._builders.pop(key, None))
+            GlobalSearchBox._builders[key] = builder
+            builder.start()
+        self._builder = GlobalSearchBox._builders[key]
+        self._builder.index_ready.connect(self._on_index_ready)
+        # The shared build may already have finished before this box connected
+        if self._builder.index is not None:
+            self._use_index(self._builder)
+    
+    def _on_index_ready(self, index):
+        self._use_index(self.sender())
+    
+    def _use_index(self, builder):
+        # Ignore results from a build superseded by newer data
+        if builder is not self._builder:
+            return
+        self.index = builder.index
+        self._builder = None
+        self.setEnabled(True)
+        self.setPlaceholderText("Search all columns...")
+        # Text restored before the index was ready only takes effect now
+        if self._apply_restored:
+            self._apply_restored = False
+            self.search_changed.emit()
+    
+    def restore_text(self, text, apply=True):
+        """Show saved search text; with apply, search_changed fires once the index is ready."""
+        self.blockSignals(True)
+        self.setText(text)
+        self.blockSignals(False)
+        self._apply_restored = apply and bool(self.query())
+        if self.index is not None and self._apply_restored:
+            self._apply_restored = False
+            self.search_changed.emit()
+    
+    def query(self):
+        """Normalized search terms, usable as a cache key."""
+        return ' '.join(tokenize(self.text()))
+    
+    def matching_rows(self, rows):
+        """Narrow sorted row positions to those matching the search terms."""
+        if self.index is None or not self.query():
+            return rows
+        return np.intersect1d(rows, self.index.search(self.query()), assume_unique=True)
+
+def resize_columns_when_shown(page):
+    """Fit a page's columns to their contents now if it is on screen, else when it is next shown."""
+    page._resize_pending = not page.isVisible()
+    if not page._resize_pending:
+        page.table_view.horizontalHeader().setResizeContentsPrecision(RESIZE_SAMPLE_ROWS)
+        page.table_view.resizeColumnsToContents()
+
+def export_cached_rows(cache, prefix, arrays):
+    """Add a filter cache's row arrays to a session; returns [state, array name] pairs."""
+    entries = []
+    for i, (state, rows) in enumerate(cache.items()):
+        name = f"{prefix}.rows.{i}"
+        arrays[name] = rows
+        entries.append([[list(item) for item in state], name])
+    return entries
+
+def restore_cached_rows(cache, entries, arrays):
+    """Refill a filter cache from export_cached_rows entries, oldest first."""
+    for state, name in entries:
+        cache.put(tuple(tuple(item) for item in state), arrays[name])
+
 class EnhancedDashboardPage(QWidget):
     """Enhanced dashboard page with comprehensive filtering and sorting."""
+    datasets_changed = pyqtSignal()
+    
     def __init__(self, report_type, title="Dashboard"):
         super().__init__()
         self.report_type = report_type
         self.title = title
         self.df = None
-        self.filtered_df = None
+        self.facet_index = None
+        self.filter_cache = FilterStateCache()
+        self._resize_pending = False
         self._setup_ui()
         
     def _setup_ui(self):
@@ -133,6 +594,7 @@ class EnhancedDashboardPage(QWidget):
         left_panel.setMaximumWidth(300)
         left_panel.setMinimumWidth(250)
         left_layout = QVBoxLayout(left_panel)
+        self.left_layout = left_layout
         
         # File operations
         file_group = QGroupBox("File Operations")
@@ -165,11 +627,15 @@ class EnhancedDashboardPage(QWidget):
         self.records_label = QLabel("Records: 0")
         table_controls.addWidget(self.records_label)
         table_controls.addStretch()
+        self.search_box = GlobalSearchBox()
+        table_controls.addWidget(self.search_box)
         
         right_layout.addLayout(table_controls)
         
         # Table view
+        self.table_model = EnhancedTableModel()
         self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
         self.table_view.setSortingEnabled(True)
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.table_view.verticalHeader().setVisible(False)
@@ -182,6 +648,12 @@ class EnhancedDashboardPage(QWidget):
         self.btn_open.clicked.connect(self._open_file)
         self.btn_save.clicked.connect(self._save_file)
         self.filter_widget.filters_changed.connect(self._apply_filters)
+        self.search_box.search_changed.connect(self._apply_filters)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._resize_pending:
+            resize_columns_when_shown(self)
     
     def _open_file(self):
         """Open and load a CSV file."""
@@ -191,12 +663,17 @@ class EnhancedDashboardPage(QWidget):
         if file_path:
             try:
                 self.df = pd.read_csv(file_path)
+                self.filter_cache.clear()
+                self.search_box.build_index(self.df)
                 self._update_display()
                 self.status_label.setText(f"Loaded: {len(self.df)} rows, {len(self.df.columns)} columns")
                 self.btn_save.setEnabled(True)
                 
                 # Update filter widget with new columns
+                self.facet_index = FacetIndex(self.df)
                 self.filter_widget.update_columns(list(self.df.columns))
+                self.filter_widget.set_facet_index(self.facet_index)
+                self.datasets_changed.emit()
                 
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to load file: {str(e)}")
@@ -206,34 +683,39 @@ class EnhancedDashboardPage(QWidget):
         if self.df is None:
             return
         
-        filtered_df = self.df.copy()
-        active_filters = self.filter_widget.get_active_filters()
+        # Case-insensitive substring filters; row positions are cached per filter state
+        state = normalize_filter_state(self.filter_widget.get_active_filters())
+        rows = self.filter_cache.rows_for(self.df, state)
+        rows = self.search_box.matching_rows(rows)
         
-        for column, filter_text in active_filters.items():
-            if column in filtered_df.columns:
-                # Apply case-insensitive string filtering, handle NaN values
-                mask = filtered_df[column].astype(str).str.contains(
-                    filter_text, case=False, na=False
-                )
-                filtered_df = filtered_df[mask]
-        
-        self.filtered_df = filtered_df
-        self._update_table(filtered_df)
+        # Only the visible row mapping changes; sorted orders are cached with the filter state
+        sort_orders = self.filter_cache.extras(state).setdefault(('sort', self.search_box.query()), {})
+        show_rows_preserving_view(self.table_view, self.table_model, rows, sort_orders)
+        self.records_label.setText(f"Records: {len(rows)}")
+        self.filter_widget.refresh_facet_counts(self._facet_rows)
+    
+    def _facet_rows(self, column):
+        """Rows matched by every filter except the one on column."""
+        filters = self.filter_widget.get_active_filters()
+        filters.pop(column, None)
+        rows = self.filter_cache.rows_for(self.df, normalize_filter_state(filters))
+        return self.search_box.matching_rows(rows)
+    
+    @property
+    def filtered_df(self):
+        """Currently displayed rows, in display order."""
+        if self.df is None:
+            return None
+        return self.df.iloc[self.table_model.rows]
     
     def _update_display(self):
         """Update the entire display with current data."""
         if self.df is not None:
-            self.filtered_df = self.df.copy()
-            self._update_table(self.filtered_df)
-    
-    def _update_table(self, data):
-        """Update table with given data."""
-        model = EnhancedTableModel(data)
-        self.table_view.setModel(model)
-        self.records_label.setText(f"Records: {len(data)}")
-        
-        # Auto-resize columns to content
-        self.table_view.resizeColumnsToContents()
+            self.table_model.set_source(self.df)
+            self.records_label.setText(f"Records: {len(self.df)}")
+            
+            # Auto-resize columns to content
+            resize_columns_when_shown(self)
     
     def _save_file(self):
         """Save the currently displayed (filtered) data."""
@@ -252,22 +734,170 @@ class EnhancedDashboardPage(QWidget):
                 QMessageBox.critical(self, "Error", f"Failed to save file: {str(e)}")
     
     def update_data(self, new_df):
-        """Update data from external source (for compatibility)."""
-        self.df = new_df.copy() if new_df is not None else None
+        """Update data from external source (for compatibility).
+        
+        The frame is shared with the Pivot Convertor and the other pages, not
+        copied; pages never modify their data in place.
+        """
+        self.df = new_df
+        self.filter_cache.clear()
         if self.df is not None:
+            self.search_box.build_index(new_df)
             self._update_display()
+            self.facet_index = FacetIndex(self.df)
             self.filter_widget.update_columns(list(self.df.columns))
+            self.filter_widget.set_facet_index(self.facet_index)
             self.status_label.setText(f"Updated: {len(self.df)} rows, {len(self.df.columns)} columns")
             self.btn_save.setEnabled(True)
+        self.datasets_changed.emit()
+    
+    def memory_datasets(self):
+        """DataFrames held by this page, for memory accounting."""
+        return {'df': self.df}
+    
+    def replace_datasets(self, frames):
+        """Swap in memory-mapped copies of the datasets; rows, sort and caches stay valid."""
+        self.df = frames['df']
+        self.table_model.replace_source(self.df)
+        self.facet_index.rebind(self.df)
+    
+    def export_session(self, prefix, tables, arrays, shared_df=None):
+        """Add this page's data and cached filter rows to a session; returns its JSON state.
+        
+        Data equal to shared_df (the Pivot Convertor's) is not stored again.
+        """
+        if self.df is None:
+            data = None
+        elif shared_df is not None and (self.df is shared_df or self.df.equals(shared_df)):
+            data = 'shared'
+        else:
+            data = f"{prefix}.df"
+            tables[data] = self.df
+        return {
+            'data': data,
+            'filters': self.filter_widget.get_active_filters(),
+            'search': self.search_box.text(),
+            'cached_rows': export_cached_rows(self.filter_cache, prefix, arrays),
+        }
+    
+    def restore_session(self, state, tables, arrays):
+        """Restore data, filters and cached rows saved by export_session."""
+        if state is None or state['data'] is None:
+            return
+        if state['data'] != 'shared':
+            self.update_data(tables[state['data']])
+        restore_cached_rows(self.filter_cache, state['cached_rows'], arrays)
+        self.filter_widget.restore_filters(state['filters'])
+        self.search_box.restore_text(state['search'])
+        self._apply_filters()
+
+class ExportDiffPage(EnhancedDashboardPage):
+    """Dashboard of what changed between two broker-bidding exports."""
+    def __init__(self):
+        self.previous_df = None
+        self.current_df = None
+        super().__init__("export_diff", "Export Diff")
+    
+    def _setup_ui(self):
+        super()._setup_ui()
+        
+        # Export selection replaces the single-file Open button
+        diff_group = QGroupBox("Compare Exports")
+        diff_layout = QVBoxLayout(diff_group)
+        
+        self.btn_open_previous = QPushButton("Open Previous Export")
+        self.previous_label = QLabel("No file selected")
+        self.btn_open_current = QPushButton("Open Current Export")
+        self.current_label = QLabel("No file selected")
+        self.btn_compare = QPushButton("Compare Exports")
+        self.btn_compare.setEnabled(False)
+        self.summary_label = QLabel("")
+        
+        for widget in (self.btn_open_previous, self.previous_label, self.btn_open_current,
+                       self.current_label, self.btn_compare, self.summary_label):
+            diff_layout.addWidget(widget)
+        self.left_layout.insertWidget(0, diff_group)
+        
+        self.btn_open.hide()
+        self.btn_save.setText("Save Diff CSV")
+        
+        self.btn_open_previous.clicked.connect(lambda: self._open_export('previous'))
+        self.btn_open_current.clicked.connect(lambda: self._open_export('current'))
+        self.btn_compare.clicked.connect(self._compare)
+    
+    def _open_export(self, which):
+        """Load the previous or current export."""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, f"Open {which.title()} Export", "", "CSV Files (*.csv);;All Files (*)"
+        )
+        if file_path:
+            try:
+                # Only the columns the comparison uses are parsed
+                df = CsvColumnLoader(file_path, encoding='utf-8-sig').read(DIFF_COLUMNS)
+                setattr(self, f"{which}_df", df)
+                getattr(self, f"{which}_label").setText(f"{os.path.basename(file_path)} ({len(df)} rows)")
+                self.btn_compare.setEnabled(self.previous_df is not None and self.current_df is not None)
+                self.datasets_changed.emit()
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to load file: {str(e)}")
+    
+    def _compare(self):
+        """Hash-join the two exports and show added, removed and changed quotes."""
+        try:
+            diff_df, summary = diff_exports(self.previous_df, self.current_df)
+        except Exception as e:
+            QMessageBox.critical(self, "Compare Error", f"Failed to compare exports: {str(e)}")
+            return
+        self.update_data(diff_df)
+        self.summary_label.setText(
+            f"Added: {summary['added']}\nRemoved: {summary['removed']}\nChanged: {summary['changed']}"
+        )
+    
+    def memory_datasets(self):
+        return {'df': self.df, 'previous': self.previous_df, 'current': self.current_df}
+    
+    def replace_datasets(self, frames):
+        self.previous_df = frames.get('previous')
+        self.current_df = frames.get('current')
+        if 'df' in frames:
+            super().replace_datasets(frames)
+    
+    def export_session(self, prefix, tables, arrays, shared_df=None):
+        state = super().export_session(prefix, tables, arrays, shared_df)
+        for which in ('previous', 'current'):
+            df = getattr(self, f"{which}_df")
+            state[which] = None
+            if df is not None:
+                tables[f"{prefix}.{which}"] = df
+                state[which] = {'table': f"{prefix}.{which}", 'label': getattr(self, f"{which}_label").text()}
+        state['summary'] = self.summary_label.text()
+        return state
+    
+    def restore_session(self, state, tables, arrays):
+        if state is None:
+            return
+        for which in ('previous', 'current'):
+            if state[which] is not None:
+                setattr(self, f"{which}_df", tables[state[which]['table']])
+                getattr(self, f"{which}_label").setText(state[which]['label'])
+        self.btn_compare.setEnabled(self.previous_df is not None and self.current_df is not None)
+        self.summary_label.setText(state['summary'])
+        super().restore_session(state, tables, arrays)
+        self.datasets_changed.emit()
 
 class PivotConvertorPage(QWidget):
     """Enhanced Pivot Convertor with comprehensive features."""
     data_loaded = pyqtSignal(pd.DataFrame)
+    datasets_changed = pyqtSignal()
     
     def __init__(self):
         super().__init__()
         self.original_df = None
         self.transformed_df = None
+        self.facet_index = None
+        self.filter_cache = FilterStateCache()
+        self._column_thread = None
+        self._resize_pending = False
         self._setup_ui()
     
     def _setup_ui(self):
@@ -332,12 +962,18 @@ class PivotConvertorPage(QWidget):
         right_panel = QWidget()
         right_layout = QVBoxLayout(right_panel)
         
+        # Global search
+        self.search_box = GlobalSearchBox()
+        right_layout.addWidget(self.search_box)
+        
         # Table info
         self.table_info = QLabel("No data to display")
         right_layout.addWidget(self.table_info)
         
         # Table
+        self.table_model = EnhancedTableModel()
         self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
         self.table_view.setSortingEnabled(True)
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         right_layout.addWidget(self.table_view)
@@ -351,6 +987,12 @@ class PivotConvertorPage(QWidget):
         self.btn_transform.clicked.connect(self._transform_data)
         self.btn_save.clicked.connect(self._save_file)
         self.filter_widget.filters_changed.connect(self._apply_filters)
+        self.search_box.search_changed.connect(self._apply_filters)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._resize_pending:
+            resize_columns_when_shown(self)
     
     def _open_file(self):
         """Open and load CSV file."""
@@ -359,31 +1001,98 @@ class PivotConvertorPage(QWidget):
         )
         if file_path:
             try:
-                self.original_df = pd.read_csv(file_path)
-                self.transformed_df = None
-                self._display_original_data()
-                
-                # Update zone combo
-                self.combo_zone.clear()
-                self.combo_zone.addItem("All Zones")
-                if 'Zone' in self.original_df.columns:
-                    zones = sorted(self.original_df['Zone'].astype(str).unique())
-                    self.combo_zone.addItems(zones)
-                
-                # Update filter widget
-                self.filter_widget.update_columns(list(self.original_df.columns))
-                
-                # Emit signal for other tabs
-                self.data_loaded.emit(self.original_df)
-                
-                self.status_label.setText(
-                    f"Date: {date.today().strftime('%B %d, %Y')}\n"
-                    f"Loaded: {len(self.original_df)} rows, {len(self.original_df.columns)} columns"
-                )
-                
+                loader = CsvColumnLoader(file_path)
+                pivot_columns = loader.available(PIVOT_COLUMNS)
+                if pivot_columns and len(pivot_columns) < len(loader.columns):
+                    # Parse the transform's columns first; the table fills in when the rest arrive
+                    self._load_dataframe(loader.read(pivot_columns), announce=False)
+                    self._start_column_load(loader)
+                else:
+                    self._load_dataframe(loader.read())
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to load file: {str(e)}")
     
+    def _start_column_load(self, loader):
+        # Parented to the page so a superseded load can finish in the background
+        self._column_thread = ColumnLoadThread(loader, self.original_df, self)
+        self._column_thread.finished.connect(self._column_thread.deleteLater)
+        self._column_thread.columns_loaded.connect(self._on_columns_loaded)
+        self._column_thread.load_failed.connect(self._on_column_load_failed)
+        self._column_thread.start()
+        self.status_label.setText(self.status_label.text() + "\nLoading remaining columns...")
+    
+    def _on_columns_loaded(self, full_df):
+        # Ignore a load superseded by opening another file
+        if self.sender() is not self._column_thread:
+            return
+        self._column_thread = None
+        # Same rows with more columns: cached rows, sort orders, transforms and filter history stay valid
+        new_columns = [col for col in full_df.columns if col not in self.original_df.columns]
+        if self.table_model.source is self.original_df:
+            header = self.table_view.horizontalHeader()
+            self.table_model.widen_source(full_df)
+            if self.table_model.sort_column >= 0:
+                header.blockSignals(True)
+                header.setSortIndicator(self.table_model.sort_column, header.sortIndicatorOrder())
+                header.blockSignals(False)
+            resize_columns_when_shown(self)
+        self.original_df = full_df
+        self.facet_index.rebind(full_df)
+        self.filter_widget.add_columns(list(full_df.columns))
+        self.filter_widget.set_facet_index(self.facet_index, new_columns)
+        self.search_box.build_index(full_df)
+        self._show_load_status()
+        self.data_loaded.emit(self.original_df)
+        self.datasets_changed.emit()
+    
+    def _on_column_load_failed(self, message):
+        if self.sender() is not self._column_thread:
+            return
+        self._column_thread = None
+        # Without the other columns the transform still works on the projected data
+        self.search_box.build_index(self.original_df)
+        self.data_loaded.emit(self.original_df)
+        QMessageBox.warning(self, "Partial Load", f"Only the pivot columns could be loaded: {message}")
+    
+    def _load_dataframe(self, df, announce=True):
+        """Show newly loaded data and, if announce, pass it on to the other tabs."""
+        if announce:
+            # Data loaded in full supersedes any background column load
+            self._column_thread = None
+        self.original_df = df
+        self.transformed_df = None
+        self.filter_cache.clear()
+        if announce:
+            self.search_box.build_index(self.original_df)
+        else:
+            # Search covers every column, so it is indexed once the rest have loaded
+            self.search_box.clear_index()
+        self._display_original_data()
+        
+        # Update zone combo from the distinct-value index
+        self.facet_index = FacetIndex(self.original_df)
+        self.combo_zone.clear()
+        self.combo_zone.addItem("All Zones")
+        if 'Zone' in self.original_df.columns:
+            self.combo_zone.addItems(self.facet_index.values('Zone'))
+        
+        # Update filter widget
+        self.filter_widget.update_columns(list(self.original_df.columns))
+        self.filter_widget.set_facet_index(self.facet_index)
+        
+        # Emit signal for other tabs
+        if announce:
+            self.data_loaded.emit(self.original_df)
+        
+        self._show_load_status()
+        self.datasets_changed.emit()
+    
+    def _show_load_status(self):
+        self.status_label.setText(
+            f"Date: {date.today().strftime('%B %d, %Y')}\n"
+            f"Loaded: {len(self.original_df)} rows, {len(self.original_df.columns)} columns"
+        )
+    
     def _display_original_data(self):
         """Display the original data."""
         if self.original_df is not None:
@@ -391,22 +1100,36 @@ class PivotConvertorPage(QWidget):
         else:
             QMessageBox.warning(self, "No Data", "Please open a file first.")
     
+    def _filtered_rows(self, state=None):
+        """Row positions matching the column filters and the global search."""
+        if state is None:
+            state = normalize_filter_state(self.filter_widget.get_active_filters())
+        rows = self.filter_cache.rows_for(self.original_df, state)
+        return self.search_box.matching_rows(rows)
+    
     def _apply_filters(self):
         """Apply filters to original data."""
         if self.original_df is None:
             return
         
-        filtered_df = self.original_df.copy()
-        active_filters = self.filter_widget.get_active_filters()
-        
-        for column, filter_text in active_filters.items():
-            if column in filtered_df.columns:
-                mask = filtered_df[column].astype(str).str.contains(
-                    filter_text, case=False, na=False
-                )
-                filtered_df = filtered_df[mask]
+        state = normalize_filter_state(self.filter_widget.get_active_filters())
+        rows = self._filtered_rows(state)
+        sort_orders = self.filter_cache.extras(state).setdefault(('sort', self.search_box.query()), {})
         
-        self._update_table(filtered_df, f"Filtered Data ({len(filtered_df)} rows)")
+        if self.table_model.source is self.original_df:
+            show_rows_preserving_view(self.table_view, self.table_model, rows, sort_orders)
+        else:
+            self.table_model.set_source(self.original_df, rows)
+            resize_columns_when_shown(self)
+        self.table_info.setText(f"Filtered Data ({len(rows)} rows) - Records: {len(rows)}")
+        self.filter_widget.refresh_facet_counts(self._facet_rows)
+    
+    def _facet_rows(self, column):
+        """Rows matched by every filter except the one on column."""
+        filters = self.filter_widget.get_active_filters()
+        filters.pop(column, None)
+        rows = self.filter_cache.rows_for(self.original_df, normalize_filter_state(filters))
+        return self.search_box.matching_rows(rows)
     
     def _transform_data(self):
         """Transform the data using pivot or groupby operations."""
@@ -415,48 +1138,24 @@ class PivotConvertorPage(QWidget):
             return
         
         try:
-            # Get filtered data if filters are active
-            active_filters = self.filter_widget.get_active_filters()
-            data_to_transform = self.original_df.copy()
-            
-            # Apply filters
-            for column, filter_text in active_filters.items():
-                if column in data_to_transform.columns:
-                    mask = data_to_transform[column].astype(str).str.contains(
-                        filter_text, case=False, na=False
-                    )
-                    data_to_transform = data_to_transform[mask]
-            
-            # Apply zone filter
+            # Get filtered data if filters are active (cached per filter state)
+            state = normalize_filter_state(self.filter_widget.get_active_filters())
             selected_zone = self.combo_zone.currentText()
-            if selected_zone != "All Zones" and 'Zone' in data_to_transform.columns:
-                data_to_transform = data_to_transform[data_to_transform['Zone'] == selected_zone]
+            pivot = self.check_zone_col.isChecked()
             
-            # Transform based on checkbox
-            if self.check_zone_col.isChecked():
-                # Pivot transformation
-                if 'User' in data_to_transform.columns and 'Zone' in data_to_transform.columns and 'Load No.' in data_to_transform.columns:
-                    self.transformed_df = pd.pivot_table(
-                        data_to_transform, 
-                        index='User', 
-                        columns='Zone', 
-                        values='Load No.', 
-                        aggfunc='count', 
-                        fill_value=0
-                    )
-                else:
-                    QMessageBox.warning(self, "Missing Columns", 
-                                      "Required columns (User, Zone, Load No.) not found.")
-                    return
-            else:
-                # Group by transformation
-                if 'User' in data_to_transform.columns and 'Load No.' in data_to_transform.columns:
-                    self.transformed_df = data_to_transform.groupby('User')['Load No.'].count().reset_index()
-                    self.transformed_df.columns = ['User', 'Load_Count']
-                else:
-                    QMessageBox.warning(self, "Missing Columns", 
-                                      "Required columns (User, Load No.) not found.")
+            # Reuse the aggregate if this filter state was already transformed the same way
+            transform_key = ('transform', self.search_box.query(), selected_zone, pivot)
+            transformed_df = self.filter_cache.get_extra(state, transform_key)
+            if transformed_df is None:
+                # Only the transform's columns are sliced out of the filtered rows
+                columns = [col for col in PIVOT_COLUMNS if col in self.original_df.columns]
+                data_to_transform = self.original_df[columns].iloc[self._filtered_rows(state)]
+                transformed_df = self._compute_transform(data_to_transform, selected_zone, pivot)
+                if transformed_df is None:
                     return
+                self.filter_cache.put_extra(state, transform_key, transformed_df)
+            self.transformed_df = transformed_df
+            self.datasets_changed.emit()
             
             # Display transformed data
             display_df = self.transformed_df.reset_index() if hasattr(self.transformed_df, 'reset_index') else self.transformed_df
@@ -466,12 +1165,19 @@ class PivotConvertorPage(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Transform Error", f"Failed to transform data: {str(e)}")
     
+    def _compute_transform(self, data_to_transform, selected_zone, pivot):
+        """Apply the zone filter and pivot/groupby; returns None if columns are missing."""
+        try:
+            return transform_bids(data_to_transform, selected_zone, pivot)
+        except ValueError as e:
+            QMessageBox.warning(self, "Missing Columns", str(e))
+            return None
+    
     def _update_table(self, data, info_text):
-        """Update table display with given data."""
-        model = EnhancedTableModel(data)
-        self.table_view.setModel(model)
+        """Switch the table to a different dataset."""
+        self.table_model.set_source(data)
         self.table_info.setText(f"{info_text} - Records: {len(data)}")
-        self.table_view.resizeColumnsToContents()
+        resize_columns_when_shown(self)
     
     def _save_file(self):
         """Save transformed data."""
@@ -489,6 +1195,226 @@ class PivotConvertorPage(QWidget):
                 QMessageBox.information(self, "Success", f"Data saved to {file_path}")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to save file: {str(e)}")
+    
+    def memory_datasets(self):
+        """DataFrames held by this page, for memory accounting."""
+        return {'original': self.original_df, 'transformed': self.transformed_df}
+    
+    def replace_datasets(self, frames):
+        """Swap in memory-mapped copies of the datasets; rows, sort and caches stay valid."""
+        if self.table_model.source is self.original_df:
+            self.table_model.replace_source(frames['original'])
+        self.original_df = frames['original']
+        self.transformed_df = frames.get('transformed')
+        self.facet_index.rebind(self.original_df)
+        # Cached pivot results are heap copies; revisited states recompute them from the mapped data
+        self.filter_cache.drop_extras('transform')
+    
+    def export_session(self, prefix, tables, arrays, shared_df=None):
+        """Add the loaded data, pivot result and filter state to a session."""
+        if self.original_df is None:
+            return None
+        tables[f"{prefix}.original"] = self.original_df
+        state = {
+            'original': f"{prefix}.original",
+            'transformed': None,
+            'showing_transformed': self.table_model.source is not self.original_df,
+            'zone': self.combo_zone.currentText(),
+            'pivot': self.check_zone_col.isChecked(),
+            'filters': self.filter_widget.get_active_filters(),
+            'search': self.search_box.text(),
+            'cached_rows': export_cached_rows(self.filter_cache, prefix, arrays),
+        }
+        if self.transformed_df is not None:
+            state['transformed'] = f"{prefix}.transformed"
+            tables[state['transformed']] = self.transformed_df
+        return state
+    
+    def restore_session(self, state, tables, arrays):
+        """Restore what export_session saved; the other tabs receive the data via data_loaded."""
+        if state is None:
+            return
+        self._load_dataframe(tables[state['original']])
+        self.combo_zone.setCurrentText(state['zone'])
+        self.check_zone_col.setChecked(state['pivot'])
+        restore_cached_rows(self.filter_cache, state['cached_rows'], arrays)
+        self.filter_widget.restore_filters(state['filters'])
+        # A restored pivot result was computed with these filters and search already
+        self.search_box.restore_text(state['search'], apply=not state['showing_transformed'])
+        if state['filters'] and not state['showing_transformed']:
+            self._apply_filters()
+        if state['transformed'] is not None:
+            self.transformed_df = tables[state['transformed']]
+            self.btn_save.setEnabled(True)
+            self.datasets_changed.emit()
+            if state['showing_transformed']:
+                self._update_table(self.transformed_df.reset_index(), "Transformed Data")
+
+class ActivityIndexBuilder(QThread):
+    """Parses quote times and dimension codes for an ActivityIndex off the UI thread."""
+    index_ready = pyqtSignal(object)
+    build_failed = pyqtSignal(str)
+    
+    def __init__(self, df, parent=None):
+        super().__init__(parent)
+        self.df = df
+    
+    def run(self):
+        try:
+            index = ActivityIndex(self.df)
+        except Exception as e:
+            self.build_failed.emit(str(e))
+            return
+        finally:
+            self.df = None
+        self.index_ready.emit(index)
+
+class ActivityPage(QWidget):
+    """Bids per hour or 15-minute window for each user, branch or zone."""
+    def __init__(self):
+        super().__init__()
+        self.activity_index = None
+        self.table_df = None
+        self._pending_df = None
+        self._builder = None
+        self._resize_pending = False
+        self._setup_ui()
+    
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+        
+        controls = QHBoxLayout()
+        self.dimension_combo = QComboBox()
+        self.window_combo = QComboBox()
+        for label, minutes in ACTIVITY_WINDOWS:
+            self.window_combo.addItem(label, minutes)
+        self.view_combo = QComboBox()
+        self.view_combo.addItems(["Time of Day", "Timeline"])
+        self.member_combo = QComboBox()
+        self.btn_save = QPushButton("Save CSV")
+        self.btn_save.setEnabled(False)
+        for label, widget in (("Group by:", self.dimension_combo), ("Window:", self.window_combo),
+                              ("View:", self.view_combo), ("Member:", self.member_combo)):
+            controls.addWidget(QLabel(label))
+            controls.addWidget(widget)
+        controls.addStretch()
+        controls.addWidget(self.btn_save)
+        layout.addLayout(controls)
+        
+        self.status_label = QLabel("Load data in the Pivot Convertor to see bidding activity")
+        layout.addWidget(self.status_label)
+        
+        self.table_model = EnhancedTableModel()
+        self.table_view = QTableView()
+        self.table_view.setModel(self.table_model)
+        self.table_view.setSortingEnabled(True)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table_view.verticalHeader().setVisible(False)
+        layout.addWidget(self.table_view)
+        
+        self.dimension_combo.currentIndexChanged.connect(self._dimension_changed)
+        self.window_combo.currentIndexChanged.connect(self._update_display)
+        self.view_combo.currentIndexChanged.connect(self._update_display)
+        self.member_combo.currentIndexChanged.connect(self._update_display)
+        self.btn_save.clicked.connect(self._save_file)
+    
+    def update_data(self, new_df):
+        """Take new data; the index is built when the tab is next shown."""
+        self._pending_df = new_df
+        if self.isVisible():
+            self._build_index()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._pending_df is not None:
+            self._build_index()
+        elif self._resize_pending:
+            resize_columns_when_shown(self)
+    
+    def _build_index(self):
+        if self._builder is not None and self._builder.isRunning():
+            # Picked up when the running build finishes
+            return
+        df, self._pending_df = self._pending_df, None
+        self.status_label.setText(f"Indexing quote times of {len(df)} rows...")
+        self._builder = ActivityIndexBuilder(df, self)
+        self._builder.index_ready.connect(self._index_ready)
+        self._builder.build_failed.connect(self._build_failed)
+        self._builder.start()
+    
+    def _build_finished(self):
+        # Data that arrived during the build replaces its result
+        if self._pending_df is not None and self.isVisible():
+            self._build_index()
+            return True
+        return False
+    
+    def _index_ready(self, index):
+        if self._build_finished():
+            return
+        self.activity_index = index
+        dimension = self.dimension_combo.currentText()
+        self.dimension_combo.blockSignals(True)
+        self.dimension_combo.clear()
+        self.dimension_combo.addItems(index.dimensions)
+        if dimension in index.dimensions:
+            self.dimension_combo.setCurrentText(dimension)
+        self.dimension_combo.blockSignals(False)
+        self._dimension_changed()
+    
+    def _build_failed(self, message):
+        if self._build_finished():
+            return
+        self.activity_index = None
+        self.table_df = None
+        self.table_model.set_source(None)
+        self.btn_save.setEnabled(False)
+        self.status_label.setText(f"No bidding activity: {message}")
+    
+    def _dimension_changed(self):
+        """Refill the member list for the chosen dimension."""
+        if self.activity_index is None:
+            return
+        grid = self.activity_index.grid(self.dimension_combo.currentText(), self.window_combo.currentData())
+        self.member_combo.blockSignals(True)
+        self.member_combo.clear()
+        self.member_combo.addItem("All")
+        self.member_combo.addItems(grid.members)
+        self.member_combo.blockSignals(False)
+        self._update_display()
+    
+    def _update_display(self):
+        """Slice the cached grid for the chosen window, view and member."""
+        if self.activity_index is None:
+            return
+        grid = self.activity_index.grid(self.dimension_combo.currentText(), self.window_combo.currentData())
+        members = None if self.member_combo.currentIndex() <= 0 else [self.member_combo.currentText()]
+        if self.view_combo.currentText() == "Timeline":
+            table = grid.timeline_table(members)
+        else:
+            table = grid.profile_table(members)
+        self.table_df = table.reset_index()
+        self.table_model.set_source(self.table_df)
+        self.btn_save.setEnabled(True)
+        self.status_label.setText(
+            f"{len(grid.members)} {self.dimension_combo.currentText()} values over {grid.day_count} days, "
+            f"{grid.total()} bids"
+        )
+        resize_columns_when_shown(self)
+    
+    def _save_file(self):
+        """Save the table currently shown."""
+        if self.table_df is None:
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Save CSV File", "", "CSV Files (*.csv);;All Files (*)"
+        )
+        if file_path:
+            try:
+                self.table_df.to_csv(file_path, index=False)
+                QMessageBox.information(self, "Success", f"Data saved to {file_path}")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Failed to save file: {str(e)}")
 
 class MainWindow(QMainWindow):
     """Main application window with all tabs."""
@@ -508,6 +1434,8 @@ class MainWindow(QMainWindow):
         self.placement_page = EnhancedDashboardPage("placement", "Placement Report")
         self.roado_erp_page = EnhancedDashboardPage("roado_erp", "Roado ERP Report")
         self.time_gap_page = EnhancedDashboardPage("time_gap", "Time Gap Bidding")
+        self.export_diff_page = ExportDiffPage()
+        self.activity_page = ActivityPage()
         
         # Add tabs
         self.tabs.addTab(self.pivot_convertor_page, "Pivot Convertor")
@@ -516,6 +1444,8 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.placement_page, "Placement Report")
         self.tabs.addTab(self.roado_erp_page, "Roado ERP Report")
         self.tabs.addTab(self.time_gap_page, "Time Gap Bidding")
+        self.tabs.addTab(self.export_diff_page, "Export Diff")
+        self.tabs.addTab(self.activity_page, "Bidding Activity")
         
         # Connect pivot convertor to other tabs
         self.pivot_convertor_page.data_loaded.connect(self.bid_performance_page.update_data)
@@ -523,6 +1453,121 @@ class MainWindow(QMainWindow):
         self.pivot_convertor_page.data_loaded.connect(self.placement_page.update_data)
         self.pivot_convertor_page.data_loaded.connect(self.roado_erp_page.update_data)
         self.pivot_convertor_page.data_loaded.connect(self.time_gap_page.update_data)
+        self.pivot_convertor_page.data_loaded.connect(self.activity_page.update_data)
+        
+        # Session menu
+        session_menu = self.menuBar().addMenu("Session")
+        session_menu.addAction("Open Session...", self._open_session)
+        session_menu.addAction("Save Session...", self._save_session)
+        
+        # Memory budget: idle tabs are spilled to memory-mapped files when it is exceeded
+        self.memory_accountant = MemoryAccountant(DEFAULT_BUDGET_MB * 1024 * 1024)
+        self.memory_label = QLabel()
+        self.budget_spin = QSpinBox()
+        self.budget_spin.setRange(128, 1024 * 1024)
+        self.budget_spin.setSingleStep(256)
+        self.budget_spin.setPrefix("Budget: ")
+        self.budget_spin.setSuffix(" MB")
+        self.budget_spin.setValue(DEFAULT_BUDGET_MB)
+        self.budget_spin.valueChanged.connect(self._set_memory_budget)
+        self.statusBar().addPermanentWidget(self.memory_label)
+        self.statusBar().addPermanentWidget(self.budget_spin)
+        for name, page in self._session_pages():
+            self.memory_accountant.register(name, page)
+            page.datasets_changed.connect(lambda name=name: self._datasets_changed(name))
+        self.tabs.currentChanged.connect(self._tab_changed)
+        self._update_memory_label()
+    
+    def _session_pages(self):
+        """Pages saved in a session, by name; the Pivot Convertor comes first as it feeds the others."""
+        return [
+            ('pivot', self.pivot_convertor_page),
+            ('bid_performance', self.bid_performance_page),
+            ('order_wise', self.order_wise_page),
+            ('placement', self.placement_page),
+            ('roado_erp', self.roado_erp_page),
+            ('time_gap', self.time_gap_page),
+            ('export_diff', self.export_diff_page),
+        ]
+    
+    def _page_name(self, widget):
+        for name, page in self._session_pages():
+            if page is widget:
+                return name
+        return None
+    
+    def _datasets_changed(self, name):
+        self.memory_accountant.update(name)
+        self._enforce_memory_budget()
+    
+    def _tab_changed(self, index):
+        # The shown tab becomes most recently used; spilled data pages back in as it is read
+        self.memory_accountant.touch(self._page_name(self.tabs.widget(index)))
+        self._enforce_memory_budget()
+    
+    def _set_memory_budget(self, megabytes):
+        self.memory_accountant.budget_bytes = megabytes * 1024 * 1024
+        self._enforce_memory_budget()
+    
+    def _enforce_memory_budget(self):
+        """Spill least recently used tabs while over budget; the visible one only moves with data it shares."""
+        spilled = self.memory_accountant.enforce(keep=self._page_name(self.tabs.currentWidget()))
+        if spilled:
+            titles = [self.tabs.tabText(self.tabs.indexOf(page))
+                      for name, page in self._session_pages() if name in spilled]
+            self.statusBar().showMessage(f"Moved to disk to stay within memory budget: {', '.join(titles)}")
+        self._update_memory_label()
+    
+    def _update_memory_label(self):
+        accountant = self.memory_accountant
+        self.memory_label.setText(
+            f"Data in memory: {format_bytes(accountant.total())} / {format_bytes(accountant.budget_bytes)}"
+        )
+        self.memory_label.setToolTip("\n".join(
+            f"{self.tabs.tabText(self.tabs.indexOf(page))}: {format_bytes(accountant.sizes()[name])}"
+            + (" (on disk)" if accountant.is_spilled(name) else "")
+            for name, page in self._session_pages()
+        ))
+    
+    def closeEvent(self, event):
+        # Background index builds and column loads must finish before their QThreads are destroyed
+        for thread in self.findChildren(QThread) + list(GlobalSearchBox._builders.values()):
+            thread.wait()
+        self.memory_accountant.close()
+        super().closeEvent(event)
+    
+    def _save_session(self):
+        """Save every tab's data, filters and cached results to one session file."""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Session", "", SESSION_FILE_FILTER)
+        if not file_path:
+            return
+        try:
+            tables, arrays = {}, {}
+            shared_df = self.pivot_convertor_page.original_df
+            state = {'current_tab': self.tabs.currentIndex()}
+            for name, page in self._session_pages():
+                state[name] = page.export_session(name, tables, arrays, shared_df)
+            save_session(file_path, tables, arrays, state)
+            self.statusBar().showMessage(f"Session saved to {os.path.basename(file_path)}")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save session: {str(e)}")
+    
+    def _open_session(self):
+        """Restore a saved session without re-reading any CSV."""
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open Session", "", SESSION_FILE_FILTER)
+        if not file_path:
+            return
+        try:
+            start = time.perf_counter()
+            tables, arrays, state = load_session(file_path)
+            for name, page in self._session_pages():
+                page.restore_session(state.get(name), tables, arrays)
+            self.tabs.setCurrentIndex(state.get('current_tab', 0))
+            self.statusBar().showMessage(
+                f"Session {os.path.basename(file_path)} restored in {time.perf_counter() - start:.2f} s"
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to open session: {str(e)}")
 
 def main():
     """Main function to run the application."""
@@ -0,0 +1,191 @@
+"""Memory accounting for the datasets held by each tab.
+
+Every tab registers with a ``MemoryAccountant`` and reports its DataFrames.
+Their deep size is tracked against a budget; when the total exceeds it, the
+least recently used tabs are spilled: their frames are written to a session
+file in the spill directory and replaced by memory-mapped views of it. The
+data then lives in the OS page cache instead of the heap, and is paged back
+from the file as a tab reads it again.
+
+Bytes that already come from a memory-mapped file are not counted, since the
+OS can drop and re-read them at any time. A DataFrame shared by several tabs
+is counted once, and spilling it rebinds every tab that holds it.
+"""
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from session_store import save_session, load_session
+
+DEFAULT_BUDGET_MB = 2048
+# Deep sizes of object columns are estimated from this many evenly spaced rows
+SIZE_SAMPLE_ROWS = 2000
+
+
+def format_bytes(size):
+    """Size in megabytes for status text."""
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def _is_file_backed(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def _object_column_size(series):
+    if len(series) <= SIZE_SAMPLE_ROWS:
+        return int(series.memory_usage(deep=True, index=False))
+    step = len(series) // SIZE_SAMPLE_ROWS
+    sample = series.iloc[::step]
+    return int(sample.memory_usage(deep=True, index=False) * len(series) / len(sample))
+
+
+def deep_size(df):
+    """Heap bytes held by a DataFrame, excluding memory-mapped buffers."""
+    if df is None:
+        return 0
+    total = int(df.index.memory_usage(deep=True))
+    for _, series in df.items():
+        values = series.array
+        if isinstance(values, pd.Categorical):
+            total += int(values.categories.memory_usage(deep=True))
+            if not _is_file_backed(values.codes):
+                total += values.codes.nbytes
+        elif isinstance(series.dtype, np.dtype) and series.dtype != object:
+            array = series.to_numpy()
+            if not _is_file_backed(array):
+                total += array.nbytes
+        else:
+            total += _object_column_size(series)
+    return total
+
+
+class MemoryAccountant:
+    """Tracks each owner's dataset size against a budget and spills the least recently used.
+
+    Owners implement ``memory_datasets()``, returning ``{name: DataFrame or None}``,
+    and ``replace_datasets(frames)``, which swaps in memory-mapped copies of them.
+    """
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_MB * 1024 * 1024, spill_dir=None):
+        self.budget_bytes = budget_bytes
+        self._spill_dir = spill_dir
+        self._owned_spill_dir = False
+        self._owners = OrderedDict()    # least recently used first
+        self._sizes = {}
+        self._frame_sizes = {}          # owner -> {id(DataFrame): bytes}
+        self._spilled = set()
+        self._spill_files = {}
+        self._spill_count = 0
+
+    def register(self, name, owner):
+        self._owners[name] = owner
+        self._sizes[name] = 0
+        self._frame_sizes[name] = {}
+
+    def touch(self, name):
+        """Mark an owner as most recently used."""
+        if name in self._owners:
+            self._owners.move_to_end(name)
+
+    def update(self, name):
+        """Re-measure an owner's datasets after they changed."""
+        self._spilled.discard(name)
+        return self._measure(name)
+
+    def is_spilled(self, name):
+        return name in self._spilled
+
+    def _measure(self, name):
+        known = {}
+        for other, frame_sizes in self._frame_sizes.items():
+            if other != name:
+                known.update(frame_sizes)
+        frames = {id(df): df for df in self._owners[name].memory_datasets().values() if df is not None}
+        # Frames another owner holds were measured with it
+        self._frame_sizes[name] = {key: known[key] if key in known else deep_size(df)
+                                   for key, df in frames.items()}
+        self._sizes[name] = sum(self._frame_sizes[name].values())
+        return self._sizes[name]
+
+    def sizes(self):
+        """Bytes per owner; a shared frame counts towards each owner holding it."""
+        return dict(self._sizes)
+
+    def total(self):
+        """Bytes of all distinct frames held by the owners."""
+        distinct = {}
+        for frame_sizes in self._frame_sizes.values():
+            distinct.update(frame_sizes)
+        return sum(distinct.values())
+
+    def enforce(self, keep=None):
+        """Spill least recently used owners (never ``keep``) until within budget.
+
+        Returns the names of the owners that were spilled, including those
+        that shared a spilled frame.
+        """
+        already_spilled = set(self._spilled)
+        for name in list(self._owners):
+            if self.total() <= self.budget_bytes:
+                break
+            if name == keep or name in self._spilled or self._sizes[name] == 0:
+                continue
+            self.spill(name)
+        return [name for name in self._owners if name in self._spilled and name not in already_spilled]
+
+    def spill(self, name):
+        """Move an owner's datasets to a memory-mapped file.
+
+        Other owners holding the same DataFrames are switched to the mapped
+        copies too, so the heap copy is actually released.
+        """
+        owner = self._owners[name]
+        tables = {key: df for key, df in owner.memory_datasets().items() if df is not None}
+        if not tables:
+            return
+        self._spill_count += 1
+        path = os.path.join(self._directory(), f"{name}-{self._spill_count}.spill")
+        save_session(path, tables, {}, {})
+        frames, _, _ = load_session(path)
+        mapped = {id(tables[key]): frame for key, frame in frames.items()}
+        for other_name, other in self._owners.items():
+            datasets = other.memory_datasets()
+            if other_name == name or any(id(df) in mapped for df in datasets.values() if df is not None):
+                other.replace_datasets({key: mapped.get(id(df), df) for key, df in datasets.items()
+                                        if df is not None})
+                self._spilled.add(other_name)
+        self._remove_file(self._spill_files.get(name))
+        self._spill_files[name] = path
+        for spilled in self._spilled:
+            self._measure(spilled)
+
+    def _directory(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='spill-')
+            self._owned_spill_dir = True
+        os.makedirs(self._spill_dir, exist_ok=True)
+        return self._spill_dir
+
+    @staticmethod
+    def _remove_file(path):
+        # Still mapped by a frame that has not been freed yet on Windows
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        """Delete spill files."""
+        for path in self._spill_files.values():
+            self._remove_file(path)
+        self._spill_files.clear()
+        if self._owned_spill_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
\ No newline at end of file
@@ -0,0 +1,176 @@
+"""Multi-core group counting for the groupby/pivot workloads.
+
+The key columns are factorized once, in the parent, into one int64 group code
+per row (-1 where a key is missing), plus a mask of rows whose value is null.
+Both arrays are placed in one ``multiprocessing.shared_memory`` block, so
+workers receive only its name and offsets, never pickled data. Groups are
+hash-partitioned by code (``code % workers``): each worker counts all rows of
+its own groups with ``np.bincount``, and the parent scatters the disjoint
+results into place without a merge step. Small inputs are counted in-process
+by the same code.
+
+Workers are started with ``forkserver`` (``spawn`` where unavailable) rather
+than ``fork``, so the Qt process and its running threads are never forked.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+PARALLEL_MIN_ROWS = 500_000
+MAX_DENSE_GROUPS = 20_000_000
+
+_pool = None
+_pool_workers = 0
+# Reports are computed on server threads; pool creation and submission must not interleave
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    """Return the shared pool, recreated for a new worker count; callers hold ``_pool_lock``."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown()
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        _pool_workers = workers
+    return _pool
+
+
+def _submit(workers, fn, calls):
+    with _pool_lock:
+        pool = _get_pool(workers)
+        return [pool.submit(fn, *args) for args in calls]
+
+
+@atexit.register
+def _shutdown_pool():
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+
+
+def _factorize(column):
+    try:
+        return pd.factorize(column, sort=True)
+    except TypeError:
+        # Mixed, unorderable key values: keep first-seen order
+        return pd.factorize(column, sort=False)
+
+
+def _group_codes(df, keys, values):
+    """Factorize the keys into one group code per row.
+
+    Returns (codes, nulls, group count, labels): codes are -1 for rows with a
+    missing key, nulls marks rows whose value is null (None without values),
+    and labels turn group codes back into key values.
+    """
+    codes, uniques = zip(*(_factorize(df[key]) for key in keys))
+    sizes = tuple(max(len(u), 1) for u in uniques)
+    missing_key = np.zeros(len(df), dtype=bool)
+    for key_codes in codes:
+        missing_key |= key_codes < 0
+
+    raw_ids = np.ravel_multi_index([np.where(c < 0, 0, c) for c in codes], sizes)
+    raw_groups = None
+    if np.prod(sizes, dtype=np.float64) > MAX_DENSE_GROUPS:
+        # Sparse key space: renumber the observed combinations densely
+        raw_ids, raw_groups = pd.factorize(raw_ids, sort=True)
+        n_groups = len(raw_groups)
+    else:
+        n_groups = int(np.prod(sizes))
+
+    group_codes = raw_ids.astype(np.int64)
+    group_codes[missing_key] = -1
+    nulls = df[values].isna().to_numpy() if values is not None else None
+    return group_codes, nulls, n_groups, (uniques, sizes, raw_groups)
+
+
+def _count_groups(group_codes, nulls, n_groups, part=0, parts=1):
+    """(valid, null) row counts of the groups with ``code % parts == part``, indexed by ``code // parts``."""
+    keep = group_codes >= 0
+    if parts > 1:
+        keep &= group_codes % parts == part
+    local = group_codes[keep] // parts
+    size = len(range(part, n_groups, parts))
+    # Bins [0, size) count valid rows, [size, 2 * size) rows with a null value
+    if nulls is not None:
+        local += size * nulls[keep]
+    bins = np.bincount(local, minlength=2 * size)
+    return bins[:size], bins[size:]
+
+
+def _count_shared(name, rows, nulls_offset, n_groups, part, parts):
+    """Worker: count one hash partition of the group codes held in shared memory."""
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        group_codes = np.ndarray((rows,), dtype=np.int64, buffer=block.buf)
+        nulls = None
+        if nulls_offset is not None:
+            nulls = np.ndarray((rows,), dtype=bool, buffer=block.buf, offset=nulls_offset)
+        counts = _count_groups(group_codes, nulls, n_groups, part, parts)
+        # The block cannot be closed while views of it exist
+        del group_codes, nulls
+        return counts
+    finally:
+        block.close()
+
+
+def _count_in_pool(group_codes, nulls, n_groups, workers):
+    nulls_offset = group_codes.nbytes if nulls is not None else None
+    size = group_codes.nbytes + (nulls.nbytes if nulls is not None else 0)
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        np.ndarray(group_codes.shape, dtype=np.int64, buffer=block.buf)[:] = group_codes
+        if nulls is not None:
+            np.ndarray(nulls.shape, dtype=bool, buffer=block.buf, offset=nulls_offset)[:] = nulls
+        futures = _submit(workers, _count_shared, [(block.name, len(group_codes), nulls_offset, n_groups,
+                                                    part, workers) for part in range(workers)])
+        valid = np.zeros(n_groups, dtype=np.int64)
+        null = np.zeros(n_groups, dtype=np.int64)
+        for part, future in enumerate(futures):
+            valid[part::workers], null[part::workers] = future.result()
+        return valid, null
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _labelled(valid, null, labels, keys, values):
+    """Series of counts for every observed group; groups whose values are all null count zero."""
+    uniques, sizes, raw_groups = labels
+    observed = np.flatnonzero(valid + null)
+    group_ids = observed if raw_groups is None else raw_groups[observed]
+    key_codes = np.unravel_index(group_ids, sizes)
+
+    if len(keys) == 1:
+        index = pd.Index(uniques[0].take(key_codes[0]), name=keys[0])
+    else:
+        index = pd.MultiIndex.from_arrays(
+            [u.take(c) for u, c in zip(uniques, key_codes)], names=list(keys))
+    return pd.Series(valid[observed].astype(np.int64), index=index, name=values)
+
+
+def count_by_keys(df, keys, values=None, workers=None):
+    """Count rows per group, like ``df.groupby(keys)[values].count()``.
+
+    Rows with a missing key are dropped. When ``values`` is given, only rows
+    with a non-null value are counted, but every observed group is kept (with
+    a zero count), matching pandas ``count``. Returns a Series indexed by the
+    key (or a MultiIndex for several keys) in sorted key order.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    group_codes, nulls, n_groups, labels = _group_codes(df, keys, values)
+    if workers < 2 or len(df) < PARALLEL_MIN_ROWS:
+        valid, null = _count_groups(group_codes, nulls, n_groups)
+    else:
+        valid, null = _count_in_pool(group_codes, nulls, n_groups, workers)
+    return _labelled(valid, null, labels, keys, values)
\ No newline at end of file
@@ -0,0 +1,29 @@
+"""The Pivot Convertor transform, shared by the Qt page and the report server."""
+from parallel_aggregation import count_by_keys
+
+ALL_ZONES = "All Zones"
+# Columns the pivot/groupby transform reads
+PIVOT_COLUMNS = ['User', 'Zone', 'Load No.']
+
+
+def transform_bids(data, zone=ALL_ZONES, pivot=False):
+    """Count loads per user, or per user and zone when pivot is set, after an optional zone filter.
+
+    Raises ValueError if the required columns are missing.
+    """
+    # Apply zone filter
+    if zone != ALL_ZONES and 'Zone' in data.columns:
+        data = data[data['Zone'] == zone]
+    
+    if pivot:
+        if not all(col in data.columns for col in ('User', 'Zone', 'Load No.')):
+            raise ValueError("Required columns (User, Zone, Load No.) not found.")
+        # Same result as pivot_table(aggfunc='count', fill_value=0), counted across cores
+        return count_by_keys(data, ['User', 'Zone'], values='Load No.').unstack(fill_value=0)
+    
+    # Group by transformation
+    if not all(col in data.columns for col in ('User', 'Load No.')):
+        raise ValueError("Required columns (User, Load No.) not found.")
+    transformed_df = count_by_keys(data, ['User'], values='Load No.').reset_index()
+    transformed_df.columns = ['User', 'Load_Count']
+    return transformed_df
\ No newline at end of file
@@ -0,0 +1,348 @@
+"""Headless localhost server for the filler, pivot and dashboard reports.
+
+Run ``python report_server.py export.csv --template template.xlsx``. The
+export is loaded once and every request is answered from the same in-memory
+data, filter cache and search index. Results are cached by dataset version
+(size and modification time of the files) and query; identical requests that
+arrive while a result is being computed wait for that one computation, so N
+users asking for the same report cost one computation. Requests are handled
+on an asyncio loop and computations run on a thread pool, so a slow report
+does not hold up the others.
+
+Endpoints (GET, JSON by default, ``format=csv`` for CSV):
+  /status   dataset version, row count and columns
+  /report   rows matching ``filter.<column>=<text>`` and ``search=<terms>``,
+            optionally ``sort=<column>``, ``descending=1``, ``offset``, ``limit``
+  /pivot    the Pivot Convertor transform: ``zone=<zone>``, ``pivot=1``, plus
+            the same filters and search as /report
+  /filler   the filled template sheets; ``sheet=<name>`` selects the CSV sheet
+            and ``format=xlsx`` returns the filled workbook of an Excel template
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qsl
+
+import numpy as np
+
+from column_loader import CsvColumnLoader
+from filter_cache import FilterStateCache, normalize_filter_state
+from pivot_transform import transform_bids, ALL_ZONES, PIVOT_COLUMNS
+from search_index import SearchIndex, tokenize
+from template_filler import (read_template, fill_template, write_filled_workbook, write_filled_csv,
+                             is_excel_file, MAIN_DATA_COLUMNS)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_RESULT_CACHE_BYTES = 256 * 1024 * 1024
+FILTER_PREFIX = 'filter.'
+
+JSON_TYPE = 'application/json'
+CSV_TYPE = 'text/csv; charset=utf-8'
+XLSX_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+def file_version(path):
+    """Version string that changes whenever the file is rewritten."""
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def read_export(path):
+    """Read a broker-bidding export with cleaned column names."""
+    try:
+        return CsvColumnLoader(path, encoding='utf-8-sig').read()
+    except UnicodeDecodeError:
+        return CsvColumnLoader(path, encoding='latin1').read()
+
+
+class Dataset:
+    """One loaded version of the export with the indexes shared by all requests."""
+    def __init__(self, version, df):
+        self.version = version
+        self.df = df
+        self._filter_cache = FilterStateCache()
+        self._search_index = None
+        self._cache_lock = threading.Lock()
+        self._index_lock = threading.Lock()
+
+    def search_index(self):
+        with self._index_lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex(self.df)
+            return self._search_index
+
+    def rows(self, filters, search=''):
+        """Sorted int32 positions of rows matching the column filters and search terms."""
+        state = normalize_filter_state(filters)
+        # FilterStateCache is not thread-safe
+        with self._cache_lock:
+            rows = self._filter_cache.rows_for(self.df, state)
+        if tokenize(search):
+            rows = np.intersect1d(rows, self.search_index().search(search), assume_unique=True)
+        return rows
+
+
+class DataStore:
+    """The export (and optional template), reloaded when the file on disk changes."""
+    def __init__(self, data_path, template_path=None):
+        self.data_path = data_path
+        self.template_path = template_path
+        self._dataset = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        version = file_version(self.data_path)
+        with self._lock:
+            if self._dataset is None or self._dataset.version != version:
+                self._dataset = Dataset(version, read_export(self.data_path))
+            return self._dataset
+
+    def template_version(self):
+        return file_version(self.template_path) if self.template_path else None
+
+
+class RequestError(Exception):
+    """A request the server can answer with a 4xx status."""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_param(params, name, default):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise RequestError(f"'{name}' must be an integer")
+    if value < 0:
+        raise RequestError(f"'{name}' must not be negative")
+    return value
+
+
+def _flag_param(params, name):
+    return params.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def _filters(params):
+    return {name[len(FILTER_PREFIX):]: value for name, value in params.items()
+            if name.startswith(FILTER_PREFIX)}
+
+
+def _frame_json(meta, df):
+    """JSON object of meta plus df's columns and rows, without re-parsing pandas' output."""
+    # to_json is far faster than json.dumps over rows; splice its {"columns":..,"data":..} in
+    frame = df.to_json(orient='split', index=False, date_format='iso')
+    return json.dumps(meta)[:-1] + (', ' if meta else '') + frame[1:]
+
+
+def _table_response(params, meta, df):
+    if params.get('format') == 'csv':
+        return CSV_TYPE, df.to_csv(index=False).encode('utf-8')
+    return JSON_TYPE, _frame_json(meta, df).encode('utf-8')
+
+
+def status_report(store, dataset, params):
+    meta = {
+        'version': dataset.version,
+        'rows': len(dataset.df),
+        'columns': [str(col) for col in dataset.df.columns],
+        'template': os.path.basename(store.template_path) if store.template_path else None,
+    }
+    return JSON_TYPE, json.dumps(meta).encode('utf-8')
+
+
+def rows_report(store, dataset, params):
+    df = dataset.df
+    rows = dataset.rows(_filters(params), params.get('search', ''))
+    column = params.get('sort')
+    if column:
+        if column not in df.columns:
+            raise RequestError(f"Unknown sort column: {column}")
+        values = df[column].iloc[rows].reset_index(drop=True)
+        ascending = not _flag_param(params, 'descending')
+        try:
+            positions = values.sort_values(ascending=ascending, kind='stable').index
+        except TypeError:
+            # Mixed types in one column: compare as text, as the dashboard tables do
+            positions = values.astype(str).sort_values(ascending=ascending, kind='stable').index
+        rows = rows[positions.to_numpy()]
+    offset = _int_param(params, 'offset', 0)
+    limit = _int_param(params, 'limit', len(rows))
+    page = df.iloc[rows[offset:offset + limit]]
+    return _table_response(params, {'version': dataset.version, 'total': len(rows), 'offset': offset}, page)
+
+
+def pivot_report(store, dataset, params):
+    rows = dataset.rows(_filters(params), params.get('search', ''))
+    columns = [col for col in PIVOT_COLUMNS if col in dataset.df.columns]
+    pivot = _flag_param(params, 'pivot')
+    try:
+        result = transform_bids(dataset.df[columns].iloc[rows], params.get('zone', ALL_ZONES), pivot)
+    except ValueError as e:
+        raise RequestError(str(e))
+    if pivot:
+        result = result.reset_index()
+        result.columns = [str(col) for col in result.columns]
+    return _table_response(params, {'version': dataset.version}, result)
+
+
+def filler_report(store, dataset, params):
+    if not store.template_path:
+        raise RequestError("The server was started without --template", status=404)
+    missing = [col for col in MAIN_DATA_COLUMNS if col not in dataset.df.columns]
+    if missing:
+        raise RequestError(f"Main data must have {', '.join(missing)} columns")
+    sheets = read_template(store.template_path)
+    if not sheets:
+        raise RequestError("Template must have a 'User' header row")
+    fill_template(dataset.df[MAIN_DATA_COLUMNS], sheets)
+
+    output_format = params.get('format', 'json')
+    if output_format == 'xlsx':
+        if not is_excel_file(store.template_path):
+            raise RequestError("format=xlsx needs an Excel template")
+        buffer = io.BytesIO()
+        write_filled_workbook(store.template_path, buffer, sheets)
+        return XLSX_TYPE, buffer.getvalue()
+    if output_format == 'csv':
+        name = params.get('sheet', sheets[0].name)
+        sheet = next((sheet for sheet in sheets if sheet.name == name), None)
+        if sheet is None:
+            raise RequestError(f"Unknown sheet: {name}")
+        text = io.StringIO()
+        write_filled_csv(text, sheet)
+        return CSV_TYPE, text.getvalue().encode('utf-8')
+    parts = [_frame_json({'name': sheet.name}, sheet.filled.drop(columns='User_Clean')) for sheet in sheets]
+    meta = json.dumps({'version': dataset.version, 'template': os.path.basename(store.template_path)})
+    return JSON_TYPE, (meta[:-1] + ', "sheets": [' + ', '.join(parts) + ']}').encode('utf-8')
+
+
+ROUTES = {
+    '/status': status_report,
+    '/report': rows_report,
+    '/pivot': pivot_report,
+    '/filler': filler_report,
+}
+
+
+class ReportServer:
+    """Answers report requests from a DataStore, sharing results between identical queries."""
+    def __init__(self, store, workers=None, cache_bytes=DEFAULT_RESULT_CACHE_BYTES):
+        self.store = store
+        self.cache_bytes = cache_bytes
+        self.computations = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self._results = OrderedDict()
+        self._result_bytes = 0
+        self._pending = {}
+
+    async def handle(self, reader, writer):
+        """asyncio stream handler: one GET request per connection."""
+        extra_headers = {}
+        try:
+            request_line = (await reader.readline()).decode('latin1').split()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            if len(request_line) != 3:
+                raise RequestError("Malformed request line")
+            method, target, _ = request_line
+            if method != 'GET':
+                raise RequestError(f"{method} is not supported", status=405)
+            status = 200
+            content_type, body, cache_state = await self.result(target)
+            extra_headers['X-Cache'] = cache_state
+        except RequestError as e:
+            status, content_type, body = e.status, JSON_TYPE, json.dumps({'error': str(e)}).encode('utf-8')
+        except Exception as e:
+            status, content_type, body = 500, JSON_TYPE, json.dumps({'error': str(e)}).encode('utf-8')
+
+        headers = {'Content-Type': content_type, 'Content-Length': str(len(body)),
+                   'Connection': 'close', **extra_headers}
+        head = f"HTTP/1.1 {status} {REASONS[status]}\r\n" + ''.join(
+            f"{name}: {value}\r\n" for name, value in headers.items()) + "\r\n"
+        try:
+            writer.write(head.encode('latin1') + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def result(self, target):
+        """Return (content type, body, 'hit' | 'shared' | 'miss') for a request target."""
+        url = urlsplit(target)
+        handler = ROUTES.get(url.path)
+        if handler is None:
+            raise RequestError(f"Unknown endpoint: {url.path}", status=404)
+        params = dict(parse_qsl(url.query))
+
+        loop = asyncio.get_running_loop()
+        # Checks the file version, and reloads it (once, for all waiting requests) if it changed
+        dataset = await loop.run_in_executor(self._executor, self.store.current)
+        key = (dataset.version, self.store.template_version(), url.path, tuple(sorted(params.items())))
+
+        cached = self._results.get(key)
+        if cached is not None:
+            self._results.move_to_end(key)
+            return cached + ('hit',)
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending) + ('shared',)
+
+        self.computations += 1
+        pending = loop.run_in_executor(self._executor, handler, self.store, dataset, params)
+        self._pending[key] = pending
+        try:
+            result = await asyncio.shield(pending)
+        finally:
+            del self._pending[key]
+        self._remember(key, result)
+        return result + ('miss',)
+
+    def _remember(self, key, result):
+        self._results[key] = result
+        self._result_bytes += len(result[1])
+        while self._result_bytes > self.cache_bytes and len(self._results) > 1:
+            _, (_, body) = self._results.popitem(last=False)
+            self._result_bytes -= len(body)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+async def serve(store, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None):
+    report_server = ReportServer(store, workers)
+    loop = asyncio.get_running_loop()
+    dataset = await loop.run_in_executor(None, store.current)
+    print(f"Loaded {len(dataset.df)} rows from {os.path.basename(store.data_path)}")
+    server = await asyncio.start_server(report_server.handle, host, port)
+    print(f"Serving reports on http://{host}:{port}/")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        report_server.close()
+
+
+def main():
+    """Main function to run the report server."""
+    parser = argparse.ArgumentParser(description="Serve filler, pivot and dashboard reports over HTTP.")
+    parser.add_argument('data', help="broker-bidding export CSV")
+    parser.add_argument('--template', help="unfilled CSV/XLSX template for /filler")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=None, help="threads computing reports")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(DataStore(args.data, args.template), args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""Inverted token index for searching across every column of a table.
+
+String columns are tokenized on word boundaries (case-insensitive); each
+token maps to a sorted int32 posting list of row positions. Tokens are only
+computed once per distinct cell value, so columns with few distinct values
+(Zone, Broker, Status) are cheap to index. Query terms match token prefixes
+through a binary search over the sorted vocabulary. Numeric columns are
+indexed by exact value, so a load number finds its rows directly.
+"""
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return _TOKEN.findall(str(text).lower())
+
+
+def _numeric_key(value):
+    """Canonical string for a number, so 1474361.0 and '1474361' agree."""
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _value_groups(column):
+    """Yield (distinct value, int32 row positions) for a column, skipping nulls."""
+    codes, uniques = pd.factorize(column)
+    order = np.argsort(codes, kind='stable').astype(np.int32)
+    sizes = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    start = int((codes < 0).sum())
+    for value, size in zip(uniques, sizes):
+        yield value, order[start:start + size]
+        start += size
+
+
+class SearchIndex:
+    """Token and numeric-value postings for one DataFrame."""
+    def __init__(self, df):
+        self.row_count = len(df)
+        text_parts = defaultdict(list)
+        numeric_parts = defaultdict(list)
+
+        for column in df.columns:
+            series = df[column]
+            is_numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+            for value, rows in _value_groups(series):
+                if is_numeric:
+                    numeric_parts[_numeric_key(value)].append(rows)
+                else:
+                    for token in set(tokenize(value)):
+                        text_parts[token].append(rows)
+
+        self._postings = {token: self._merge(parts) for token, parts in text_parts.items()}
+        self._numeric = {key: self._merge(parts) for key, parts in numeric_parts.items()}
+        self._vocabulary = sorted(self._postings)
+
+    @staticmethod
+    def _merge(parts):
+        return parts[0] if len(parts) == 1 else np.unique(np.concatenate(parts))
+
+    def _term_rows(self, term):
+        """Rows matching one term: any token with that prefix, or an equal number."""
+        matches = []
+        i = bisect_left(self._vocabulary, term)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+            matches.append(self._postings[self._vocabulary[i]])
+            i += 1
+        try:
+            numeric = self._numeric.get(_numeric_key(term))
+        except ValueError:
+            numeric = None
+        if numeric is not None:
+            matches.append(numeric)
+
+        if not matches:
+            return np.empty(0, dtype=np.int32)
+        return self._merge(matches)
+
+    def search(self, query):
+        """Return sorted int32 positions of rows matching every term of the query."""
+        terms = tokenize(query)
+        if not terms:
+            return np.arange(self.row_count, dtype=np.int32)
+        # Intersect the smallest posting lists first
+        postings = sorted((self._term_rows(term) for term in set(terms)), key=len)
+        rows = postings[0]
+        for other in postings[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows.astype(np.int32, copy=False)
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""Single-file session snapshots with memory-mappable columns.
+
+Layout: an 8-byte magic, the manifest length (uint64), a JSON manifest, then
+64-byte aligned raw buffers. Numeric and datetime columns are stored as
+their numpy buffers (tz-aware datetimes in UTC); text and other columns as
+integer codes into a sorted list of distinct values kept in the manifest,
+with the original dtype recorded so text, object and categorical columns
+come back as they were saved. On load the whole file is memory-mapped
+copy-on-write and numeric columns are views into it, so restoring a session
+does no CSV parsing and reads pages lazily.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'ADVSESS1'
+ALIGN = 64
+SESSION_FILE_FILTER = "Session Files (*.session);;All Files (*)"
+
+
+def json_value(value):
+    """Scalars stored in the manifest (labels, template cells) must survive a JSON round trip."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _codes_dtype(category_count):
+    """Smallest code type pandas picks for this many categories, so loading needs no copy."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if category_count < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class _Writer:
+    def __init__(self):
+        self.blobs = []
+        self.size = 0
+
+    def add(self, array):
+        array = np.ascontiguousarray(array)
+        padding = -self.size % ALIGN
+        self.blobs.append((padding, array))
+        self.size += padding
+        meta = {'offset': self.size, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+        self.size += array.nbytes
+        return meta
+
+    def add_column(self, series):
+        dtype = series.dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+            return {'kind': 'numpy', 'data': self.add(series.to_numpy())}
+        if isinstance(dtype, pd.api.extensions.ExtensionDtype) and getattr(dtype, 'numpy_dtype', None) is not None \
+                and dtype.numpy_dtype.kind in 'biuf':
+            mask = series.isna().to_numpy()
+            data = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+            return {'kind': 'masked', 'dtype': str(dtype), 'data': self.add(data), 'mask': self.add(mask)}
+
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            return {'kind': 'datetimetz', 'tz': str(dtype.tz), 'data': self.add(series.dt.tz_convert(None).to_numpy())}
+
+        # Text and mixed columns: sorted distinct values plus integer codes (-1 = missing)
+        present = series.notna().to_numpy()
+        values = series[present]
+        if isinstance(dtype, pd.CategoricalDtype):
+            restore = 'category'
+            values = values.astype(object).astype(str)
+        elif isinstance(dtype, pd.StringDtype):
+            restore = str(dtype)
+        else:
+            restore = 'object'
+        try:
+            value_codes, categories = pd.factorize(values, sort=True)
+        except TypeError:
+            # Mixed, unorderable values: keep first-seen order
+            value_codes, categories = pd.factorize(values, sort=False)
+        codes = np.full(len(series), -1, dtype=_codes_dtype(len(categories)))
+        codes[present] = value_codes
+        return {'kind': 'category', 'dtype': restore, 'categories': [json_value(value) for value in categories],
+                'codes': self.add(codes)}
+
+    def add_frame(self, df):
+        meta = {'columns_name': json_value(df.columns.name), 'index': None}
+        if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+            names = [json_value(name) for name in df.index.names]
+            meta['index'] = names
+            df = df.reset_index(names=[f'__index_{i}__' for i in range(len(names))])
+        meta['labels'] = [json_value(col) for col in df.columns]
+        meta['rows'] = len(df)
+        meta['columns'] = [self.add_column(df.iloc[:, i]) for i in range(df.shape[1])]
+        return meta
+
+
+def save_session(path, tables, arrays, state):
+    """Write DataFrames, numpy arrays and a JSON-able state dict to one file."""
+    writer = _Writer()
+    manifest = {
+        'tables': {name: writer.add_frame(df) for name, df in tables.items() if df is not None},
+        'arrays': {name: writer.add(array) for name, array in arrays.items()},
+        'state': state,
+    }
+    manifest_bytes = json.dumps(manifest).encode('utf-8')
+    header_size = len(MAGIC) + 8 + len(manifest_bytes)
+    header_padding = -header_size % ALIGN
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(manifest_bytes)).tobytes())
+        f.write(manifest_bytes)
+        f.write(b'\0' * header_padding)
+        for padding, array in writer.blobs:
+            f.write(b'\0' * padding)
+            f.write(array.tobytes())
+    os.replace(temp_path, path)
+
+
+class _Reader:
+    def __init__(self, buffer, data_start):
+        self.buffer = buffer
+        self.data_start = data_start
+
+    def array(self, meta):
+        dtype = np.dtype(meta['dtype'])
+        shape = tuple(meta['shape'])
+        start = self.data_start + meta['offset']
+        count = int(np.prod(shape, dtype=np.int64))
+        return self.buffer[start:start + count * dtype.itemsize].view(dtype).reshape(shape)
+
+    def column(self, meta):
+        if meta['kind'] == 'numpy':
+            return self.array(meta['data'])
+        if meta['kind'] == 'masked':
+            array_type = pd.api.types.pandas_dtype(meta['dtype']).construct_array_type()
+            return array_type(self.array(meta['data']), self.array(meta['mask']))
+        if meta['kind'] == 'datetimetz':
+            return pd.DatetimeIndex(self.array(meta['data'])).tz_localize('UTC').tz_convert(meta['tz']).array
+        codes = self.array(meta['codes'])
+        restore = meta.get('dtype', 'category')
+        if restore == 'category':
+            return pd.Categorical.from_codes(codes, categories=meta['categories'], validate=False)
+        # Code -1 picks the trailing missing value (NaN, as read_csv gives object columns)
+        values = np.array(meta['categories'] + [np.nan], dtype=object)[codes]
+        return values if restore == 'object' else pd.array(values, dtype=restore)
+
+    def frame(self, meta):
+        columns = {i: self.column(col) for i, col in enumerate(meta['columns'])}
+        df = pd.DataFrame(columns, index=pd.RangeIndex(meta['rows']), copy=False)
+        df.columns = meta['labels']
+        if meta['index'] is not None:
+            index_columns = [f'__index_{i}__' for i in range(len(meta['index']))]
+            df = df.set_index(index_columns)
+            df.index.names = meta['index']
+        df.columns.name = meta['columns_name']
+        return df
+
+
+def load_session(path):
+    """Memory-map a session file; returns (tables, arrays, state)."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Not a session file")
+        manifest_size = int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+        manifest = json.loads(f.read(manifest_size).decode('utf-8'))
+    header_size = len(MAGIC) + 8 + manifest_size
+    data_start = header_size + (-header_size % ALIGN)
+
+    # Copy-on-write, so in-place edits of restored frames never touch the file
+    buffer = np.memmap(path, dtype=np.uint8, mode='c')
+    reader = _Reader(buffer, data_start)
+    tables = {name: reader.frame(meta) for name, meta in manifest['tables'].items()}
+    arrays = {name: reader.array(meta) for name, meta in manifest['arrays'].items()}
+    return tables, arrays, manifest['state']
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""Template reading and filling helpers for the Bid Data Filler tool.
+
+Templates can be CSV or XLSX. XLSX workbooks are scanned with openpyxl's
+read-only streaming reader; every sheet that contains a ``User`` header row
+becomes one ``TemplateSheet``. All sheets are filled from a single user x day
+aggregate of the main data and written back into a copy of the workbook so
+the original formatting is kept.
+"""
+import csv
+import os
+import re
+import pandas as pd
+from openpyxl import load_workbook
+
+from parallel_aggregation import count_by_keys
+from user_matching import UserMatcher, normalize_user_name
+
+GRAND_TOTAL = 'Grand Total'
+# The only columns of the main data export the filler reads
+MAIN_DATA_COLUMNS = ['User', 'Date']
+HEADER_SCAN_ROWS = 20
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+
+
+class TemplateSheet:
+    """One fillable table found in a template file."""
+    def __init__(self, name, preamble, header, data):
+        self.name = name
+        self.preamble = preamble    # raw rows above the header row
+        self.header = header        # cleaned header names, one per sheet column
+        self.data = data            # indexed by 1-based sheet row number
+        self.filled = None
+
+
+def is_excel_file(path):
+    """Return True if the path points at an XLSX/XLSM workbook."""
+    return os.path.splitext(path)[1].lower() in EXCEL_EXTENSIONS
+
+
+def normalize_header(value):
+    """Turn a header cell into a clean string (Excel's 1.0 becomes '1')."""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if pd.isna(value):
+            return ''
+        if value.is_integer():
+            value = int(value)
+    return str(value).strip().replace('\ufeff', '')
+
+
+def day_columns(columns):
+    """Return the day-number columns ('1', '2', ...) of a template."""
+    return [col for col in columns if col.isdigit()]
+
+
+def find_header_row(rows, required='User'):
+    """Return the index of the first row containing the required header, or None."""
+    for i, row in enumerate(rows[:HEADER_SCAN_ROWS]):
+        if required in [normalize_header(value) for value in row]:
+            return i
+    return None
+
+
+def _build_sheet(name, rows):
+    """Split raw sheet rows into preamble, header and body; None if no header."""
+    header_idx = find_header_row(rows)
+    if header_idx is None:
+        return None
+
+    header = [normalize_header(value) for value in rows[header_idx]]
+    while header and not header[-1]:
+        header.pop()
+    width = len(header)
+    header = [col or f"Unnamed: {i}" for i, col in enumerate(header)]
+
+    body = []
+    row_numbers = []
+    for offset, row in enumerate(rows[header_idx + 1:], start=header_idx + 2):
+        values = [None if value == '' else value for value in list(row[:width])]
+        values += [None] * (width - len(values))
+        if all(value is None for value in values):
+            continue
+        body.append(values)
+        row_numbers.append(offset)
+
+    data = pd.DataFrame(body, columns=header, index=row_numbers)
+    return TemplateSheet(name, [list(row) for row in rows[:header_idx]], header, data)
+
+
+def _read_excel_rows(path):
+    """Stream every sheet of a workbook as (name, rows) using the read-only reader."""
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for worksheet in workbook.worksheets:
+            yield worksheet.title, [tuple(row) for row in worksheet.iter_rows(values_only=True)]
+    finally:
+        workbook.close()
+
+
+def _read_csv_rows(path):
+    """Read a CSV template as raw rows, falling back to latin1 on decode errors."""
+    try:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            return list(csv.reader(f))
+    except UnicodeDecodeError:
+        with open(path, newline='', encoding='latin1') as f:
+            return list(csv.reader(f))
+
+
+def read_template(path):
+    """Read every fillable sheet of a CSV or XLSX template."""
+    if is_excel_file(path):
+        raw_sheets = _read_excel_rows(path)
+    else:
+        raw_sheets = [(os.path.splitext(os.path.basename(path))[0], _read_csv_rows(path))]
+
+    sheets = []
+    for name, rows in raw_sheets:
+        sheet = _build_sheet(name, rows)
+        if sheet is not None:
+            sheets.append(sheet)
+    return sheets
+
+
+def extract_day(date_str):
+    """Extract the day number (1-6) from an 'Aug 1, 2025, ...' date string, or None."""
+    if pd.isna(date_str) or not isinstance(date_str, str):
+        return None
+    
+    # Clean the string
+    date_str = str(date_str).strip().replace('\ufeff', '')
+    
+    # Pattern 1: "Aug 1, 2025, 3:56:33 AM" or similar
+    match = re.search(r'Aug\s+(\d+)[,\s]', date_str)
+    if match:
+        day = int(match.group(1))
+        return day if 1 <= day <= 6 else None
+    
+    # Pattern 2: Just "Aug 1" format
+    match = re.search(r'Aug\s+(\d+)', date_str)
+    if match:
+        day = int(match.group(1))
+        return day if 1 <= day <= 6 else None
+        
+    return None
+
+
+def prepare_main_data(main_df):
+    """Add User_Clean and Day columns, dropping rows without a user.
+
+    Returns the prepared frame and the ``{user: key}`` map of distinct users.
+    """
+    unique_users = main_df['User'].dropna().unique()
+    user_keys = {user: normalize_user_name(user) for user in unique_users}
+    main_df = main_df.assign(User_Clean=main_df['User'].map(user_keys))
+    main_df = main_df[main_df['User_Clean'].notna() & (main_df['User_Clean'] != '')].copy()
+    main_df['Day'] = main_df['Date'].apply(extract_day)
+    return main_df, user_keys
+
+
+def resolve_sheet_users(sheet, matcher):
+    """Match a sheet's User column to main-data users and set its User_Clean column."""
+    grand_total_key = normalize_user_name(GRAND_TOTAL)
+    results = matcher.resolve(sheet.data['User'].tolist())
+    sheet.data['User_Clean'] = [
+        GRAND_TOTAL if result.key == grand_total_key else (result.match or result.key)
+        for result in results
+    ]
+    return results
+
+
+def fill_template(main_df, sheets, prepared=False):
+    """Fill every sheet from main data and return the match results.
+
+    ``main_df`` is the raw export (User and Date columns), or the output of
+    ``prepare_main_data`` when ``prepared`` is True.
+    """
+    if not prepared:
+        main_df, _ = prepare_main_data(main_df)
+    user_day_counts = aggregate_user_day_counts(main_df[main_df['Day'].notna()])
+    matcher = UserMatcher(user_day_counts.index)
+    results = []
+    for sheet in sheets:
+        results.extend(resolve_sheet_users(sheet, matcher))
+        sheet.filled = fill_template_sheet(sheet.data, user_day_counts)
+    return results
+
+
+def aggregate_user_day_counts(main_df):
+    """Count bids per cleaned user and day in one pass (users x day columns)."""
+    counts = count_by_keys(main_df, ['User_Clean', 'Day']).unstack(fill_value=0)
+    counts.columns = [str(int(day)) for day in counts.columns]
+    return counts
+
+
+def fill_template_sheet(template_df, user_day_counts):
+    """Fill day columns, per-user totals and the Grand Total row of one sheet.
+
+    ``template_df`` must carry a ``User_Clean`` column matching the index of
+    ``user_day_counts``.
+    """
+    filled = template_df.copy()
+    days = day_columns(filled.columns)
+
+    users = filled['User_Clean']
+    is_total = users == GRAND_TOTAL
+    is_user = users.notna() & (users != '') & ~is_total
+
+    counts = (user_day_counts.reindex(columns=days, fill_value=0)
+              .reindex(users.where(is_user)).fillna(0).astype(int))
+    counts.index = filled.index
+    for col in days:
+        filled[col] = counts[col].where(is_user, 0)
+
+    if GRAND_TOTAL in filled.columns:
+        filled[GRAND_TOTAL] = filled[days].sum(axis=1)
+
+    if is_total.any():
+        gt_idx = filled.index[is_total][0]
+        totals = filled.loc[is_user, days].sum()
+        for col in days:
+            filled.at[gt_idx, col] = totals[col]
+        if GRAND_TOTAL in filled.columns:
+            filled.at[gt_idx, GRAND_TOTAL] = totals.sum()
+
+    return filled
+
+
+def _filled_cells(sheet):
+    """Yield (row, column, value) for every count cell of a filled sheet."""
+    targets = day_columns(sheet.header) + ([GRAND_TOTAL] if GRAND_TOTAL in sheet.header else [])
+    users = sheet.filled['User_Clean']
+    rows = users.index[users.notna() & (users != '')]
+    for col in targets:
+        col_number = sheet.header.index(col) + 1
+        for row_number in rows:
+            yield row_number, col_number, int(sheet.filled.at[row_number, col])
+
+
+def write_filled_workbook(source_path, output_path, sheets):
+    """Write filled values back into a copy of the source workbook, keeping formatting."""
+    workbook = load_workbook(source_path)
+    for sheet in sheets:
+        if sheet.filled is None:
+            continue
+        worksheet = workbook[sheet.name]
+        for row_number, col_number, value in _filled_cells(sheet):
+            worksheet.cell(row=row_number, column=col_number, value=value)
+    workbook.save(output_path)
+
+
+def write_filled_csv(output, sheet):
+    """Write a filled sheet as CSV to a path or text stream, preserving the rows above its header."""
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            write_filled_csv(f, sheet)
+        return
+    output_df = sheet.filled.drop('User_Clean', axis=1)
+    writer = csv.writer(output)
+    for row in sheet.preamble:
+        writer.writerow(['' if value is None else value for value in row])
+    output_df.to_csv(output, index=False)
\ No newline at end of file
@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from export_diff import diff_exports, ADDED, REMOVED, CHANGED
+
+
+@pytest.fixture
+def export():
+    return pd.DataFrame({
+        'Load No.': [1473082, 1473082, 1473090, 1473091],
+        'Broker': ['SAI SAMARTH ROADLINES', 'SAI SAMARTH ROADLINES', 'JAI MATA DI', 'JAI MATA DI'],
+        'Quote Time': ['Aug 1, 2025, 12:48:38 PM', 'Aug 1, 2025, 12:48:40 PM',
+                       'Aug 1, 2025, 1:05:00 PM', 'Aug 1, 2025, 1:07:00 PM'],
+        'Quote': [12500, 12000, 30000, 31000],
+        'Status': ['CREATED', 'CREATED', 'CREATED', 'CREATED'],
+    })
+
+
+def test_identical_exports_have_no_changes(export):
+    result, summary = diff_exports(export, export.copy())
+    assert result.empty
+    assert summary == {ADDED: 0, REMOVED: 0, CHANGED: 0}
+
+
+def test_dropping_the_earlier_of_two_quotes_is_one_removal(export):
+    result, summary = diff_exports(export, export.drop(index=0))
+    assert summary == {ADDED: 0, REMOVED: 1, CHANGED: 0}
+    assert result.loc[0, 'Previous Quote'] == 12500
+
+
+def test_changed_quote_keeps_its_quote_time(export):
+    current = export.copy()
+    current.loc[1, 'Quote'] = 11500
+    result, summary = diff_exports(export, current)
+    assert summary == {ADDED: 0, REMOVED: 0, CHANGED: 1}
+    assert (result.loc[0, 'Previous Quote'], result.loc[0, 'Current Quote']) == (12000, 11500)
+
+
+def test_requote_at_a_new_time_pairs_in_time_order(export):
+    current = export.copy()
+    current.loc[3, ['Quote Time', 'Quote']] = ['Aug 1, 2025, 1:09:00 PM', 30500]
+    result, summary = diff_exports(export, current)
+    assert summary == {ADDED: 0, REMOVED: 0, CHANGED: 1}
+    assert result.loc[0, 'Load No.'] == 1473091
\ No newline at end of file
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from filter_cache import FilterStateCache, normalize_filter_state
+
+
+def test_drop_extras_releases_their_bytes():
+    cache = FilterStateCache()
+    states = [normalize_filter_state({'Zone': zone}) for zone in ('east', 'west')]
+    for state in states:
+        cache.put(state, np.arange(1_000, dtype=np.int32))
+    rows_bytes = cache._bytes
+    for state in states:
+        extras = cache.extras(state)
+        extras[('transform', '', 'All Zones', False)] = pd.DataFrame({'Load_Count': np.arange(500)})
+        extras.setdefault(('sort', ''), {})[('User', 0)] = np.arange(1_000)
+
+    cache.drop_extras('transform')
+
+    assert cache._bytes == rows_bytes + 2 * np.arange(1_000).nbytes
+    for state in states:
+        assert list(cache.extras(state)) == [('sort', '')]
\ No newline at end of file
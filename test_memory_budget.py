@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from export_diff import diff_exports
+from memory_budget import MemoryAccountant, deep_size
+
+
+class Owner:
+    def __init__(self, **frames):
+        self.frames = frames
+
+    def memory_datasets(self):
+        return dict(self.frames)
+
+    def replace_datasets(self, frames):
+        self.frames.update(frames)
+
+
+@pytest.fixture
+def exports():
+    rng = np.random.default_rng(0)
+    n = 5_000
+    previous = pd.DataFrame({
+        'Load No.': rng.integers(1_470_000, 1_472_000, n),
+        'Broker': pd.array(np.array(['SAI SAMARTH ROADLINES', 'JAI MATA DI', 'SHREE GANESH'])[rng.integers(0, 3, n)],
+                           dtype='str'),
+        'Quote Time': pd.date_range('2025-08-01', periods=n, freq='min').strftime('%b %-d, %Y, %-I:%M:%S %p'),
+        'Quote': rng.integers(10_000, 40_000, n).astype(float),
+        'Status': pd.array(np.array(['CREATED', 'APPROVED'])[rng.integers(0, 2, n)], dtype='str'),
+    })
+    current = previous.drop(index=range(0, n, 50)).copy()
+    current.loc[current.index[::40], 'Status'] = 'CANCELLED'
+    return previous, current
+
+
+def test_spilled_frames_page_back_unchanged(exports, tmp_path):
+    previous, current = exports
+    expected, expected_summary = diff_exports(previous, current)
+    accountant = MemoryAccountant(budget_bytes=deep_size(previous) // 2, spill_dir=str(tmp_path))
+    owner = Owner(previous=previous, current=current)
+    accountant.register('Export Diff', owner)
+    accountant.update('Export Diff')
+
+    assert accountant.enforce() == ['Export Diff']
+    spilled = owner.memory_datasets()
+    assert spilled['previous'] is not previous
+    for name, frame in (('previous', previous), ('current', current)):
+        assert spilled[name].dtypes.to_dict() == frame.dtypes.to_dict()
+        assert spilled[name].equals(frame)
+
+    result, summary = diff_exports(spilled['previous'], spilled['current'])
+    assert summary == expected_summary
+    pd.testing.assert_frame_equal(result, expected)
+    accountant.close()
\ No newline at end of file
@@ -0,0 +1,87 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import parallel_aggregation
+from parallel_aggregation import count_by_keys
+
+
+@pytest.fixture
+def bids():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    users = np.array(['AMIT', 'SONU', 'Deepak', 'naveen', 'RAJESH PANDEY'], dtype=object)
+    df = pd.DataFrame({
+        'User': users[rng.integers(0, len(users), n)],
+        'Zone': np.array(['East', 'West', 'North'], dtype=object)[rng.integers(0, 3, n)],
+        'Day': rng.integers(1, 7, n).astype(float),
+        'Load No.': rng.integers(1000, 2000, n).astype(float),
+    })
+    df.loc[rng.random(n) < 0.05, 'User'] = None
+    df.loc[rng.random(n) < 0.05, 'Day'] = np.nan
+    df.loc[rng.random(n) < 0.2, 'Load No.'] = np.nan
+    # A group whose values are all null must still be listed, with a zero count
+    df.loc[df['User'] == 'SONU', 'Load No.'] = np.nan
+    return df
+
+
+@pytest.fixture(params=[1, 3], ids=['serial', 'pool'])
+def workers(request, monkeypatch):
+    monkeypatch.setattr(parallel_aggregation, 'PARALLEL_MIN_ROWS', 0)
+    return request.param
+
+
+def test_count_matches_groupby(bids, workers):
+    result = count_by_keys(bids, ['User'], values='Load No.', workers=workers)
+    expected = bids.groupby('User')['Load No.'].count()
+    pd.testing.assert_series_equal(result, expected, check_index_type=False)
+
+
+def test_count_matches_pivot_table(bids, workers):
+    result = count_by_keys(bids, ['User', 'Zone'], values='Load No.', workers=workers).unstack(fill_value=0)
+    expected = bids.pivot_table(index='User', columns='Zone', values='Load No.', aggfunc='count', fill_value=0)
+    pd.testing.assert_frame_equal(result, expected.loc[result.index], check_dtype=False,
+                                  check_names=False, check_index_type=False, check_column_type=False)
+
+
+def test_count_rows_with_null_keys(bids, workers):
+    result = count_by_keys(bids, ['User', 'Day'], workers=workers)
+    expected = bids.groupby(['User', 'Day']).size()
+    pd.testing.assert_series_equal(result, expected, check_names=False, check_index_type=False)
+
+
+def test_pool_matches_serial(bids, monkeypatch):
+    monkeypatch.setattr(parallel_aggregation, 'PARALLEL_MIN_ROWS', 0)
+    serial = count_by_keys(bids, ['User', 'Zone'], values='Load No.', workers=1)
+    pooled = count_by_keys(bids, ['User', 'Zone'], values='Load No.', workers=4)
+    pd.testing.assert_series_equal(pooled, serial)
+
+
+def test_pool_benchmark(monkeypatch, capsys):
+    rng = np.random.default_rng(1)
+    n = 2_000_000
+    users = np.array([f'USER {i}' for i in range(5_000)], dtype=object)
+    df = pd.DataFrame({
+        'User': users[rng.integers(0, len(users), n)],
+        'Zone': np.array(['East', 'West', 'North', 'South'], dtype=object)[rng.integers(0, 4, n)],
+        'Load No.': rng.integers(1_000_000, 2_000_000, n).astype(float),
+    })
+    df.loc[rng.random(n) < 0.1, 'Load No.'] = np.nan
+    monkeypatch.setattr(parallel_aggregation, 'PARALLEL_MIN_ROWS', 0)
+    workers = max(os.cpu_count() or 1, 2)
+    count_by_keys(df.head(1_000), ['User'], workers=workers)     # start the pool outside the timing
+
+    timings = {}
+    results = {}
+    for label, count in (('serial', 1), ('pool', workers)):
+        start = time.perf_counter()
+        results[label] = count_by_keys(df, ['User', 'Zone'], values='Load No.', workers=count)
+        timings[label] = time.perf_counter() - start
+
+    pd.testing.assert_series_equal(results['pool'], results['serial'])
+    with capsys.disabled():
+        print(f"\ncount_by_keys on {n:,} rows: serial {timings['serial']:.2f} s, "
+              f"{workers} workers {timings['pool']:.2f} s, speedup {timings['serial'] / timings['pool']:.2f}x")
\ No newline at end of file
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from export_diff import diff_exports
+from session_store import save_session, load_session
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Load No.': [1473082, 1473082, 1473090, 1473091],
+        'Quote': [12500.0, 12000.0, np.nan, 31000.0],
+        'Broker': pd.array(['SAI SAMARTH ROADLINES', 'SAI SAMARTH ROADLINES', None, 'JAI MATA DI'], dtype='str'),
+        'Vehicle': pd.array(['32 FT', None, '20 FT', '32 FT'], dtype='string'),
+        'Mixed': pd.array([1473082, 'LOAD-7', np.nan, 2.5], dtype=object),
+        'Approved': [True, False, True, True],
+        'Trucks': pd.array([1, None, 3, 2], dtype='Int64'),
+        'Zone': pd.Categorical(['East', 'West', None, 'East']),
+        'Quote Time': pd.to_datetime(['2025-08-01 12:48:38', '2025-08-01 12:48:40', None, '2025-08-01 13:07:00']),
+        'Quoted At': pd.to_datetime(['2025-08-01 12:48:38', None, '2025-08-01 13:05:00', '2025-08-01 13:07:00'])
+                     .tz_localize('Asia/Kolkata'),
+    }, index=pd.Index([10, 11, 12, 13], name='row'))
+
+
+def test_round_trip_keeps_dtypes(frame, tmp_path):
+    path = tmp_path / 'bids.session'
+    save_session(path, {'bids': frame}, {}, {})
+    tables, _, _ = load_session(path)
+    restored = tables['bids']
+    assert restored.dtypes.to_dict() == frame.dtypes.to_dict()
+    # copy() turns memory-mapped columns into plain arrays, except categorical codes,
+    # so Zone is compared on its values
+    pd.testing.assert_frame_equal(restored.copy(), frame, check_categorical=False)
+    assert restored['Zone'].cat.categories.tolist() == ['East', 'West']
+    assert restored['Zone'].astype(object).equals(frame['Zone'].astype(object))
+
+
+def test_restored_exports_still_diff(frame, tmp_path):
+    export = frame.reset_index(drop=True).assign(
+        **{'Quote Time': ['Aug 1, 2025, 12:48:38 PM', 'Aug 1, 2025, 12:48:40 PM', None, 'Aug 1, 2025, 1:07:00 PM'],
+           'Status': pd.array(['CREATED', 'CREATED', 'CREATED', 'CANCELLED'], dtype='str')})
+    current = export.drop(index=0).assign(Status=pd.array(['CREATED'] * 3, dtype='str'))
+    path = tmp_path / 'exports.session'
+    save_session(path, {'previous': export, 'current': current}, {}, {})
+    tables, _, _ = load_session(path)
+    result, summary = diff_exports(tables['previous'], tables['current'])
+    assert summary == {'added': 0, 'removed': 1, 'changed': 1}
\ No newline at end of file
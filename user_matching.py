@@ -0,0 +1,173 @@
+"""User-name matching between a template and the main bidding data.
+
+Names are normalized (Unicode NFKC, accents and zero-width characters removed,
+case-folded, punctuation and repeated whitespace collapsed) before matching.
+Template names are resolved by exact normalized match first, then by names
+that differ only in initials ("amit k" / "amit", "rajesh p" / "rajesh pandey"),
+found through a word index, then by fuzzy match against candidates pulled from
+a character trigram index, so the cost per lookup depends on the number of
+similar names rather than on the total number of users.
+"""
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+DEFAULT_THRESHOLD = 0.85
+AMBIGUITY_MARGIN = 0.03
+MAX_CANDIDATES = 20
+NGRAM_SIZE = 3
+
+_INVISIBLE_CHARS = dict.fromkeys(map(ord, '\ufeff\u200b\u200c\u200d\u2060\u00ad'))
+_NON_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_user_name(name):
+    """Return the comparison key for a user name, or None for blank names."""
+    if name is None or (not isinstance(name, str) and pd.isna(name)):
+        return None
+    text = unicodedata.normalize('NFKC', str(name)).translate(_INVISIBLE_CHARS)
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text)
+                   if not unicodedata.combining(ch))
+    text = _NON_WORD.sub(' ', text.casefold()).strip()
+    return text or None
+
+
+def _ngrams(key):
+    padded = f" {key} "
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def name_similarity(a, b):
+    """Similarity in [0, 1] of two normalized names, ignoring token order."""
+    return max(SequenceMatcher(None, a, b).ratio(),
+               SequenceMatcher(None, ' '.join(sorted(a.split())), ' '.join(sorted(b.split()))).ratio())
+
+
+def initials_compatible(a, b):
+    """Whether two normalized names are the same apart from initials.
+
+    Words must pair up in order, each pair equal or a single letter that starts
+    the other word; the longer name may have extra trailing initials. At least
+    one full word must be equal, so "a k" does not match "amit kumar".
+    """
+    a_words, b_words = a.split(), b.split()
+    if len(a_words) < len(b_words):
+        a_words, b_words = b_words, a_words
+    if any(len(word) > 1 for word in a_words[len(b_words):]):
+        return False
+    shared_word = False
+    for x, y in zip(a_words, b_words):
+        if x == y:
+            shared_word = shared_word or len(x) > 1
+        elif not ((len(x) == 1 and y.startswith(x)) or (len(y) == 1 and x.startswith(y))):
+            return False
+    return shared_word
+
+
+class MatchResult:
+    """Outcome of resolving one template name."""
+    def __init__(self, name, key, match=None, method='none', score=0.0, candidates=None):
+        self.name = name
+        self.key = key
+        self.match = match              # normalized main-data key, or None
+        self.method = method            # 'exact', 'initials', 'fuzzy', 'ambiguous' or 'none'
+        self.score = score
+        self.candidates = candidates or []
+
+
+class UserMatcher:
+    """Resolve template user names against the distinct users of the main data."""
+    def __init__(self, main_keys, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.keys = sorted({key for key in main_keys if key})
+        self._key_set = set(self.keys)
+        self._index = defaultdict(list)
+        for key_id, key in enumerate(self.keys):
+            for gram in _ngrams(key):
+                self._index[gram].append(key_id)
+        # Very common trigrams (" sh", "an ") block nothing, skip them at lookup
+        self._max_posting = max(50, len(self.keys) // 20)
+        # Full words (not initials) -> names containing them, for initials matching
+        self._word_index = defaultdict(list)
+        for key_id, key in enumerate(self.keys):
+            for word in set(key.split()):
+                if len(word) > 1:
+                    self._word_index[word].append(key_id)
+
+    def _candidates(self, key, exclude):
+        postings = sorted((self._index[gram] for gram in _ngrams(key) if gram in self._index), key=len)
+        shared = Counter()
+        for i, posting in enumerate(postings):
+            # Always keep the rarest few trigrams so every name has some candidates
+            if i >= 3 and len(posting) > self._max_posting:
+                break
+            shared.update(posting)
+
+        candidates = []
+        for key_id, _ in shared.most_common():
+            other = self.keys[key_id]
+            # Length filter: SequenceMatcher.ratio() can never exceed this bound
+            if 2 * min(len(key), len(other)) / (len(key) + len(other)) < self.threshold:
+                continue
+            if other in exclude:
+                continue
+            candidates.append(other)
+            if len(candidates) >= MAX_CANDIDATES:
+                break
+        return candidates
+
+    def _initials_candidates(self, key, exclude):
+        # A compatible name shares at least one full word with the key
+        key_ids = set()
+        for word in set(key.split()):
+            if len(word) > 1:
+                key_ids.update(self._word_index.get(word, ()))
+        return sorted(other for other in (self.keys[key_id] for key_id in key_ids)
+                      if other not in exclude and initials_compatible(key, other))
+
+    def resolve(self, names):
+        """Resolve template names; returns one MatchResult per input name.
+
+        Main-data users claimed by an exact match are not offered as fuzzy
+        candidates for other template names.
+        """
+        keyed = [(name, normalize_user_name(name)) for name in names]
+        claimed = {key for _, key in keyed if key in self._key_set}
+
+        results = []
+        for name, key in keyed:
+            if key is None:
+                results.append(MatchResult(name, key))
+            elif key in self._key_set:
+                results.append(MatchResult(name, key, key, 'exact', 1.0))
+            else:
+                results.append(self._initials_match(name, key, claimed) or self._fuzzy_match(name, key, claimed))
+        return results
+
+    def _initials_match(self, name, key, claimed):
+        """Match on names equal apart from initials; None when there is no such name."""
+        matches = self._initials_candidates(key, claimed)
+        if not matches:
+            return None
+        # Scored by plain similarity for reporting only; the rule itself decides the match
+        scored = [(other, name_similarity(key, other)) for other in matches]
+        if len(scored) > 1:
+            return MatchResult(name, key, None, 'ambiguous', max(score for _, score in scored), scored)
+        best, score = scored[0]
+        return MatchResult(name, key, best, 'initials', score, scored)
+
+    def _fuzzy_match(self, name, key, claimed):
+        scored = sorted(((name_similarity(key, other), other)
+                         for other in self._candidates(key, claimed)), reverse=True)
+        scored = [(score, other) for score, other in scored if score >= self.threshold]
+        if not scored:
+            return MatchResult(name, key)
+
+        best_score, best = scored[0]
+        close = [(other, score) for score, other in scored if best_score - score <= AMBIGUITY_MARGIN]
+        if len(close) > 1:
+            return MatchResult(name, key, None, 'ambiguous', best_score, close)
+        return MatchResult(name, key, best, 'fuzzy', best_score, [(best, best_score)])
\ No newline at end of file